@@ -0,0 +1,15 @@
+# coding: utf-8
+'''
+# ベンチマーク
+`python -m bench` でホットパスの計測一式(suite.py)を実行し、JSONで保存・比較できます。
+`python -m bench.<名前>` で個別の最適化の前後比較を実行します。
+'''
+import timeit
+
+def best(func, number=10000, repeat=5) -> float:
+    """funcを1回呼び出す時間(秒)の最良値"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def report(name:str, sec:float):
+    """計測結果を表示する"""
+    print(f'{name:<40} {sec*1e9:>12.1f} ns')
@@ -0,0 +1,2 @@
+from .suite import main
+main()
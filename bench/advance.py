@@ -0,0 +1,38 @@
+# coding: utf-8
+'''
+# ターンの早送り
+Nターン分の経過にかかる時間を、advance(N)とturn()をN回呼ぶ手順で比較します。
+```bash
+python -m bench.advance
+```
+'''
+from game_status import *
+from . import best
+
+class Regen(buff.Buff):
+    effect = Value(arg(1))
+    duration = Point(arg(10**9), turn(-1))
+    HP = buff.Add(effect)
+    @property
+    def is_disabled(self): return self.duration <= 0
+
+class Player(GameObject):
+    HP_max = Value(arg(10**6))
+    HP = Value(arg(100), minim(0), maxim(HP_max), turn(-2))
+    MP = Point(arg(0), turn(1, every=3))
+
+def player() -> Player:
+    return Player([Regen(), Regen(effect=2, duration=500)])
+
+def main():
+    print(f'{"turns":>8} {"advance us":>12} {"turn() us":>12}')
+    for n in (10, 1000, 100000):
+        def fast(): player().advance(n)
+        def slow():
+            p = player()
+            for _ in range(n): p.turn()
+        t1 = best(fast, number=100, repeat=3)
+        t2 = best(slow, number=max(1, 1000 // n), repeat=3)
+        print(f'{n:>8} {t1*1e6:>12.1f} {t2*1e6:>12.1f}')
+
+if __name__ == '__main__': main()
@@ -0,0 +1,42 @@
+# coding: utf-8
+'''
+# バフのターン経過の速度
+N個のバフを持つオブジェクトのturn()一回の時間を計測します。
+比較として、dir()で全属性を走査していた以前のBuff.turnも計測します。
+```bash
+python -m bench.buff_turn
+```
+'''
+from game_status import *
+from . import best
+
+class Status(GameObject):
+    HP = Point(arg(10**9))
+    MP = Point(arg(10**9))
+
+class Regen(buff.Buff):
+    effect = Value(arg(default=1))
+    duration = Point(arg(default=10**9), turn(-1))
+    HP = buff.Add(effect)
+    MP = buff.Add(-effect)
+    @property
+    def is_disabled(self): return self.duration <= 0
+
+def turn_dir(b, stat):
+    """dir()で走査する以前の手順"""
+    for d in dir(b): b.act(d, stat)
+
+def main():
+    print(f'{"buffs":>6} {"planned us":>11} {"dir() us":>11} {"expire us":>11}')
+    for n in (1, 10, 100, 1000):
+        obj = Status([Regen() for _ in range(n)])
+        planned = best(obj.turn, number=20)
+        scan = best(lambda: [turn_dir(b, obj) for b in obj.buffs], number=20)
+        def expire():
+            # 全バフが同じターンに終了するときの取り除き
+            obj = Status([Regen(duration=1) for _ in range(n)])
+            obj.turn()
+        expire_t = best(expire, number=5)
+        print(f'{n:>6} {planned*1e6:>11.1f} {scan*1e6:>11.1f} {expire_t*1e6:>11.1f}')
+
+if __name__ == '__main__': main()
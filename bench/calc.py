@@ -0,0 +1,44 @@
+# coding: utf-8
+'''
+# Calcの読み出し速度
+コンパイル済みの関数と、木構造を辿る評価(Calc._interpret)を比較します。
+```bash
+python -m bench.calc
+```
+'''
+from game_status import *
+from . import best, report
+
+class Status(GameObject):
+    STR = Value(arg(0), minim(0), grow())
+    HP_max = (STR + 1) * 10
+    HP = Point(arg(HP_max), minim(0), maxim(HP_max))
+
+class Apple(GameObject):
+    freshness = Value(arg(100), turn(-1))
+    on_eat_HpRecover = (
+        (freshness >= 50) * 10 +
+        (freshness >= 0 ) * 20 +
+        -10)
+    description = (
+        "みずみずしい新鮮なりんご。" * (freshness >= 50) +
+        "ちょっとしんなりし始めているりんご。" * (50 > freshness >= 0) +
+        "ハエがたかり異臭を放つりんご。" * (freshness < 0) +
+        "食べると体力が" +
+        Calc(str, on_eat_HpRecover) + "ポイント" +
+            "減少" * (on_eat_HpRecover <  0) +
+            "回復" * (on_eat_HpRecover >= 0) + "する。")
+
+def main():
+    for cls, obj, name in (
+            (Status, Status(STR=2), 'HP_max'),
+            (Apple, Apple(), 'on_eat_HpRecover'),
+            (Apple, Apple(), 'description')):
+        calc = vars(cls)[name]
+        interp = best(lambda: calc._interpret(obj, cls))
+        comp = best(lambda: calc.__get__(obj, cls))
+        report(f'{cls.__name__}.{name} interpreted', interp)
+        report(f'{cls.__name__}.{name} compiled', comp)
+        print(f'{"":<40} x{interp/comp:.2f}')
+
+if __name__ == '__main__': main()
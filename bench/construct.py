@@ -0,0 +1,39 @@
+# coding: utf-8
+'''
+# オブジェクト生成の速度
+ステータス数ごとの生成速度(objects/sec)を計測します。
+比較として、生成のたびに依存関係を整列していた以前の手順も計測します。
+```bash
+python -m bench.construct
+```
+'''
+import graphlib
+from game_status import *
+from . import best
+
+def make_class(n:int) -> type:
+    """n個のValueと、それぞれに依存するn個のCalcを持つクラス"""
+    ns = {}
+    for i in range(n):
+        ns[f's{i}'] = v = Value(arg(i), minim(0))
+        ns[f'c{i}'] = v * 2
+    return type(f'Stats{n}', (GameObject,), ns)
+
+def construct_sorted(cls, **ka):
+    """インスタンスごとに整列する以前の手順"""
+    obj = cls.__new__(cls)
+    obj._buffs = []
+    for n in graphlib.TopologicalSorter(cls._dependency_graph).static_order():
+        if n in ka: obj._init(n, ka[n])
+        else: obj._default_init(n)
+    return obj
+
+def main():
+    print(f'{"stats":>6} {"planned obj/s":>14} {"sorted obj/s":>14}')
+    for n in (1, 5, 20, 100, 500):
+        cls = make_class(n)
+        planned = best(cls, number=200)
+        sorted_ = best(lambda: construct_sorted(cls), number=200)
+        print(f'{n*2:>6} {1/planned:>14,.0f} {1/sorted_:>14,.0f}')
+
+if __name__ == '__main__': main()
@@ -0,0 +1,42 @@
+# coding: utf-8
+'''
+# ステータス値の索引
+上位k件としきい値の問い合わせを、StatIndexと全オブジェクトの走査で比較します。
+索引の側は、毎回一部のオブジェクトを書き換えてから問い合わせます(並べ直しの時間を含む)。
+```bash
+python -m bench.index
+```
+'''
+import heapq, random
+from game_status import *
+from game_status.index import StatIndex
+from . import best
+
+class Monster(GameObject):
+    STR = Value(arg(1))
+    HP_max = (STR + 1) * 10
+    HP = Point(arg(HP_max))
+
+def main():
+    print(f'{"objects":>8} {"query":>10} {"index us":>10} {"scan us":>10}')
+    rng = random.Random(0)
+    for n in (1000, 10000, 100000):
+        ms = [Monster(STR=rng.randint(1, 1000)) for _ in range(n)]
+        for m in ms: m.HP = rng.randint(0, m.HP_max)
+        by_str = StatIndex("STR", ms)
+        ratio = StatIndex(Monster.HP / Monster.HP_max, ms)
+        touched = ms[:n // 100] # 1%が書き換えられる
+        def touch():
+            for m in touched: m.STR += 1
+        queries = (
+            ("top100", lambda: by_str.top(100),
+             lambda: heapq.nlargest(100, ms, key=lambda m: m.STR)),
+            ("HP<10%", lambda: ratio.below(0.1),
+             lambda: [m for m in ms if m.HP < m.HP_max * 0.1]))
+        for name, indexed, scan in queries:
+            def q(): touch() ; indexed()
+            t1 = best(q, number=10, repeat=3)
+            t2 = best(scan, number=3, repeat=3)
+            print(f'{n:>8} {name:>10} {t1*1e6:>10.1f} {t2*1e6:>10.1f}')
+
+if __name__ == '__main__': main()
@@ -0,0 +1,36 @@
+# coding: utf-8
+'''
+# インスタンスあたりのメモリ
+通常のクラスとcompact=Trueのクラスで、1インスタンスあたりのバイト数を比較します。
+```bash
+python -m bench.memory
+```
+'''
+import gc, tracemalloc
+from game_status import *
+
+def make_class(n:int, compact:bool) -> type:
+    ns = {}
+    for i in range(n):
+        if i % 2: ns[f's{i}'] = Value(arg(i), grow())
+        else: ns[f's{i}'] = Point(arg(i))
+    return type(f'Mem{n}', (GameObject,), ns, compact=compact)
+
+def bytes_per_instance(cls, count=10000) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [cls() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return (after - before) / count
+
+def main():
+    print(f'{"stats":>6} {"dict B/obj":>11} {"compact B/obj":>14}')
+    for n in (4, 16, 64):
+        plain = bytes_per_instance(make_class(n, False))
+        compact = bytes_per_instance(make_class(n, True))
+        print(f'{n:>6} {plain:>11.0f} {compact:>14.0f}')
+
+if __name__ == '__main__': main()
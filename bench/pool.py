@@ -0,0 +1,65 @@
+# coding: utf-8
+'''
+# バフのプール
+1ターンで終わるバフを毎ターン付け直すときの、1サイクルの時間と
+新しく確保されたメモリブロック数、世代0のGCの回数を、
+毎回生成する場合とクラスごとのプール(使い回し)から取り出す場合で比較します。
+プールはこのベンチマークの中だけにあり、game_statusには含めていません
+(生成は速く、プールはかえって遅くメモリも多く使うため)。
+```bash
+python -m bench.pool
+```
+'''
+import gc, sys
+from game_status import *
+from . import best
+
+class Status(GameObject):
+    HP = Point(arg(0))
+
+class Proc(buff.Buff):
+    effect = Value(arg(1))
+    duration = Point(arg(1), turn(-1))
+    HP = buff.Add(effect)
+
+class PooledProc(Proc):
+    """終了したインスタンスを使い回す"""
+    _free = []
+    def __new__(cls, *a, **ka):
+        free = cls._free
+        return free.pop() if free else super().__new__(cls)
+    def recycle(self):
+        vars(self).clear() # __init__で設定し直す
+        self._free.append(self)
+
+def cycle(target, cls, procs:int):
+    pooled = cls is PooledProc
+    def run():
+        made = [cls() for _ in range(procs)]
+        for b in made: target.buffs.append(b)
+        target.turn() # すべて終了して取り除かれる
+        if pooled:
+            for b in made: b.recycle()
+    return run
+
+def pressure(run, number=1000) -> tuple[int, int]:
+    """(増えたメモリブロック数の最大, 世代0のGCの回数)"""
+    run() # プールを満たす
+    gc.collect()
+    blocks, before = sys.getallocatedblocks(), gc.get_stats()[0]["collections"]
+    peak = 0
+    for _ in range(number):
+        run()
+        peak = max(peak, sys.getallocatedblocks() - blocks)
+    return peak, gc.get_stats()[0]["collections"] - before
+
+def main():
+    print(f'{"procs":>6} {"kind":>7} {"us/cycle":>9} {"peak blocks":>12} {"gen0 GCs":>9}')
+    for procs in (1, 10, 100):
+        for kind, cls in (("plain", Proc), ("pooled", PooledProc)):
+            run = cycle(Status(), cls, procs)
+            t = best(run, number=max(1, 10000 // procs), repeat=3)
+            peak, gcs = pressure(run)
+            print(f'{procs:>6} {kind:>7} {t*1e6:>9.2f} {peak:>12} {gcs:>9}')
+
+if __name__ == '__main__': main()
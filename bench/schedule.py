@@ -0,0 +1,41 @@
+# coding: utf-8
+'''
+# ターンの予定
+大半が眠っている(または間隔の長い)オブジェクトの集まりで、1ティックの時間を比較します。
+Scheduler.step()と、全オブジェクトのturn()を毎ティック呼ぶ手順を計測します。
+```bash
+python -m bench.schedule
+```
+'''
+from game_status import *
+from game_status.schedule import Scheduler
+from . import best
+
+class Apple(GameObject):
+    turn_period = 60
+    freshness = Value(arg(100), turn(-1))
+class Player(GameObject):
+    HP = Point(arg(100), minim(0), maxim(100), turn(1))
+class NPC(GameObject):
+    turn_period = None
+    HP = Point(arg(100), minim(0), maxim(100), turn(1))
+
+def population(n:int) -> list:
+    """1%が毎ティック、30%が60ティックごと、残りが眠っている"""
+    return ([Player() for _ in range(n // 100)] +
+            [Apple() for _ in range(n * 30 // 100)] +
+            [NPC() for _ in range(n - n // 100 - n * 30 // 100)])
+
+def main():
+    print(f'{"objects":>8} {"scheduled us/tick":>18} {"all us/tick":>12}')
+    for n in (1000, 10000, 100000):
+        objs = population(n)
+        sched = Scheduler()
+        for o in objs: sched.add(o)
+        scheduled = best(sched.step, number=600, repeat=3)
+        def sweep():
+            for o in objs: o.turn()
+        sweep = best(sweep, number=3, repeat=3)
+        print(f'{n:>8} {scheduled*1e6:>18.1f} {sweep*1e6:>12.1f}')
+
+if __name__ == '__main__': main()
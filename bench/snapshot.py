@@ -0,0 +1,56 @@
+# coding: utf-8
+'''
+# スナップショットの速度
+snapshotとpickleで、多数のオブジェクトを保存・復元する速度(objects/sec)を比較します。
+```bash
+python -m bench.snapshot
+```
+'''
+import os, pickle, tempfile, time
+from game_status import *
+from game_status import snapshot
+
+class Monster(GameObject):
+    STR = Value(arg(10), minim(0), grow(), buffed())
+    DEX = Value(arg(5), grow())
+    name = Value(arg("slime"))
+    HP_max = (STR + 1) * 10
+    HP = Point(arg(HP_max), minim(0), maxim(HP_max), turn(1))
+    MP = Point(arg(20.5), minim(0))
+
+class Poison(buff.Buff):
+    effect = Value(arg(1))
+    duration = Point(arg(10), turn(-1))
+    HP = buff.Add(-effect)
+    @property
+    def is_disabled(self): return self.duration <= 0
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    print(f'{"objects":>8} {"method":>9} {"save obj/s":>12} {"load obj/s":>12} {"bytes/obj":>10}')
+    with tempfile.TemporaryDirectory() as d:
+        for n in (1000, 100000):
+            objs = [Monster(STR=i % 50) for i in range(n)]
+            for o in objs[::10]: o.buffs.append(Poison())
+            path = os.path.join(d, 'world.snap')
+            save = timed(lambda: snapshot.save(path, objs))
+            size = os.path.getsize(path)
+            def load():
+                with snapshot.load(path) as snap: list(snap)
+            load = timed(load)
+            print(f'{n:>8} {"snapshot":>9} {n/save:>12,.0f} {n/load:>12,.0f} {size/n:>10.1f}')
+            path = os.path.join(d, 'world.pickle')
+            def save():
+                with open(path, 'wb') as f: pickle.dump(objs, f, pickle.HIGHEST_PROTOCOL)
+            save = timed(save)
+            size = os.path.getsize(path)
+            def load():
+                with open(path, 'rb') as f: pickle.load(f)
+            load = timed(load)
+            print(f'{n:>8} {"pickle":>9} {n/save:>12,.0f} {n/load:>12,.0f} {size/n:>10.1f}')
+
+if __name__ == '__main__': main()
@@ -0,0 +1,36 @@
+# coding: utf-8
+'''
+# スタックするバフのターン経過の速度
+同じバフをN個重ねたときのturn()一回の時間を、スタックするバフと
+別々のインスタンスとして持つバフで比較します。
+```bash
+python -m bench.stacks
+```
+'''
+from game_status import *
+from . import best
+
+class Status(GameObject):
+    HP = Point(arg(10**9))
+
+class Poison(buff.Buff):
+    effect = Value(arg(default=1))
+    duration = Point(arg(default=10**9))
+    HP = buff.Add(-effect)
+    @property
+    def is_disabled(self): return False
+
+class StackingPoison(Poison, stacking=True): pass
+
+def main():
+    print(f'{"stacks":>7} {"stacking us":>12} {"separate us":>12}')
+    for n in (1, 10, 100, 1000):
+        stacked, separate = Status(), Status()
+        for _ in range(n):
+            stacked.buffs.append(StackingPoison())
+            separate.buffs.append(Poison())
+        t1 = best(stacked.turn, number=100)
+        t2 = best(separate.turn, number=100)
+        print(f'{n:>7} {t1*1e6:>12.2f} {t2*1e6:>12.2f}')
+
+if __name__ == '__main__': main()
@@ -0,0 +1,41 @@
+# coding: utf-8
+'''
+# 起動までの時間
+データから大量のクラスを生成したときの、定義から最初のインスタンス生成までの時間を計測します。
+ステータス数を変えてステータス1個あたりの時間がほぼ一定(線形)であることを確かめます。
+```bash
+python -m bench.startup            # 500クラス × 200ステータス
+python -m bench.startup 100 1000   # 100クラス × 1000ステータス
+```
+'''
+import sys, time
+from game_status import *
+
+def schema(n:int) -> dict:
+    """n個のステータスを持つクラスの名前空間(Value, Point, Calcを混ぜる)"""
+    ns = {}
+    for i in range(0, n - 2, 3):
+        ns[f'base{i}'] = v = Value(arg(i), minim(0), grow(), buffed())
+        ns[f'max{i}'] = m = (v + 1) * 10
+        ns[f'cur{i}'] = Point(arg(m), minim(0), maxim(m), turn(1))
+    return ns
+
+def startup(classes:int, stats:int) -> float:
+    start = time.perf_counter()
+    for c in range(classes):
+        cls = type(f'Entity{c}', (GameObject,), schema(stats))
+        cls()
+    return time.perf_counter() - start
+
+def main():
+    if len(sys.argv) == 3:
+        classes, stats = map(int, sys.argv[1:])
+        sec = startup(classes, stats)
+        print(f'{classes} classes x {stats} stats: {sec:.3f} s')
+        return
+    print(f'{"classes":>8} {"stats":>6} {"total s":>9} {"us/stat":>9}')
+    for classes, stats in ((500, 50), (500, 100), (500, 200), (100, 1000)):
+        sec = startup(classes, stats)
+        print(f'{classes:>8} {stats:>6} {sec:>9.3f} {sec/classes/stats*1e6:>9.2f}')
+
+if __name__ == '__main__': main()
@@ -0,0 +1,32 @@
+# coding: utf-8
+'''
+# StatActのまとめての呼び出し
+40人×10ステータス値に経験値を与える時間を、1回ずつの`obj.gainexp(name, exp)`と
+`StatAct.apply_many`、`StatAct.apply_all`で比較します。
+```bash
+python -m bench.statact
+```
+'''
+from game_status import *
+from game_status.bases import StatAct
+from . import best
+
+NAMES = tuple(f's{i}' for i in range(10))
+Player = type('Player', (GameObject,),
+              {n: Value(arg(1.), grow(.1)) for n in NAMES})
+
+def main():
+    players = [Player() for _ in range(40)]
+    items = [(p, n, 10) for p in players for n in NAMES]
+    def per_call():
+        for p in players:
+            for n in NAMES: p.gainexp(n, 10)
+    cases = (("obj.gainexp(name, exp)", per_call),
+             ("StatAct.apply_many", lambda: StatAct.apply_many("gainexp", items)),
+             ("StatAct.apply_all", lambda: StatAct.apply_all(
+                 "gainexp", players, NAMES, 10)))
+    print(f'{"":<24} {"us/400 calls":>13}')
+    for name, func in cases:
+        print(f'{name:<24} {best(func, number=200)*1e6:>13.1f}')
+
+if __name__ == '__main__': main()
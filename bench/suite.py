@@ -0,0 +1,195 @@
+# coding: utf-8
+'''
+# ベンチマーク一式
+ホットパスの計測をまとめて実行し、結果をJSONに保存・比較します。
+```bash
+python -m bench                      # すべて実行
+python -m bench -k turn --full       # 名前にturnを含むものを1Mオブジェクトまで
+python -m bench --json new.json      # 結果を保存
+python -m bench --compare old.json   # 以前の結果と比較(遅くなったものがあれば終了コード1)
+```
+各計測は「1回あたりの時間」の最良値をナノ秒で記録します。
+'''
+import gc, json, platform, sys, time
+
+from game_status import *
+
+_CASES = [] # [(名前, パラメータ名, パラメータの一覧, --fullでのみ使う一覧, 計測関数), ...]
+
+def case(name:str, param:str='n', values=(1,), large=()):
+    """計測を登録する(largeは--fullのときだけ使うパラメータ)"""
+    def deco(func):
+        _CASES.append((name, param, tuple(values), tuple(large), func))
+        return func
+    return deco
+
+def timed(func, number:int, repeat:int=5) -> float:
+    """funcをnumber回呼び出す時間の最良値を1回あたりで返す(GCは止める)"""
+    res = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number): func()
+            res.append(time.perf_counter() - start)
+    finally:
+        if enabled: gc.enable()
+    return min(res) / number
+
+def _number(n:int, budget:int=200000) -> int:
+    """1回にn個処理する計測の呼び出し回数"""
+    return max(1, budget // n)
+
+
+# 定義
+def _status_class(name='Status', memoize=False):
+    class Status(GameObject, memoize=memoize):
+        STR = Value(arg(0), minim(0), grow(), buffed())
+        HP_max = (STR + 1) * 10
+        HP = Point(arg(HP_max), minim(0), maxim(HP_max), turn(1))
+    Status.__name__ = Status.__qualname__ = name
+    return Status
+
+def _deep_class(depth:int):
+    ns = {'A': Value(arg(1))}
+    expr = ns['A']
+    for i in range(depth): expr = expr * 1 + i
+    ns['deep'] = expr
+    return type(f'Deep{depth}', (GameObject,), ns)
+
+def _wide_class(n:int):
+    ns = {}
+    for i in range(n):
+        ns[f's{i}'] = v = Value(arg(i), minim(0))
+        ns[f'c{i}'] = v * 2
+    return type(f'Wide{n}', (GameObject,), ns)
+
+class _Buffed(GameObject):
+    STR = Value(arg(10), buffed())
+
+@StatAct.actfunc
+def read_effect(b, obj, val): return val * 2 # 読み出し時に2倍
+class _Rage(buff.Buff):
+    duration = Point(arg(10**9), turn(-1))
+    @property
+    def is_disabled(self): return self.duration <= 0
+read_effect.register(_Rage, "STR")
+
+class _Regen(buff.Buff):
+    effect = Value(arg(1))
+    duration = Point(arg(10**9), turn(-1))
+    HP = buff.Add(effect)
+    @property
+    def is_disabled(self): return self.duration <= 0
+
+
+# 読み出し
+@case('read.value')
+def _(n):
+    obj = _status_class()(STR=3)
+    return timed(lambda: obj.STR, 100000)
+@case('read.point')
+def _(n):
+    obj = _status_class()(STR=3)
+    return timed(lambda: obj.HP, 100000)
+@case('read.calc.shallow')
+def _(n):
+    obj = _status_class()(STR=3)
+    return timed(lambda: obj.HP_max, 100000)
+@case('read.calc.memo')
+def _(n):
+    obj = _status_class(memoize=True)(STR=3)
+    return timed(lambda: obj.HP_max, 100000)
+@case('read.calc.deep', 'depth', (4, 16, 64))
+def _(depth):
+    obj = _deep_class(depth)()
+    return timed(lambda: obj.deep, 20000)
+@case('read.buffed', 'buffs', (0, 1, 10, 100))
+def _(buffs):
+    obj = _Buffed([_Rage() for _ in range(buffs)])
+    return timed(lambda: obj.STR, _number(buffs + 1, 100000))
+
+# 生成
+@case('construct.stats', 'stats', (2, 20, 200))
+def _(stats):
+    cls = _wide_class(stats // 2)
+    return timed(cls, _number(stats, 20000))
+@case('construct.entities', 'n', (1, 1000, 100000), large=(1000000,))
+def _(n):
+    cls = _status_class()
+    def spawn(): [cls(STR=i) for i in range(n)]
+    return timed(spawn, _number(n), repeat=3) / n
+
+# ターン
+@case('turn.entities', 'n', (1, 1000, 100000), large=(1000000,))
+def _(n):
+    cls = _status_class()
+    objs = [cls(STR=i % 100) for i in range(n)]
+    def turn():
+        for o in objs: o.turn()
+    return timed(turn, _number(n), repeat=3) / n
+@case('turn.buffs', 'buffs', (1, 10, 100, 1000))
+def _(buffs):
+    obj = _status_class()([_Regen() for _ in range(buffs)])
+    return timed(obj.turn, _number(buffs, 20000)) / buffs
+
+# クラス定義
+@case('classdef.stats', 'stats', (10, 100, 1000))
+def _(stats):
+    return timed(lambda: _wide_class(stats // 2), _number(stats, 5000), repeat=3)
+
+
+def run(select:str='', full:bool=False, out=sys.stdout) -> dict:
+    """登録された計測を実行し、{"名前[パラメータ=値]": ns}を返す"""
+    res = {}
+    for name, param, values, large, func in _CASES:
+        if select not in name: continue
+        for v in values + (large if full else ()):
+            key = f'{name}[{param}={v}]'
+            res[key] = func(v) * 1e9
+            print(f'{key:<40} {res[key]:>12.1f} ns', file=out, flush=True)
+    return res
+
+def environment() -> dict:
+    return {'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def compare(old:dict, new:dict, threshold:float, out=sys.stdout) -> list[str]:
+    """結果を比較して表示し、threshold以上遅くなった計測の名前を返す"""
+    slower = []
+    print(f'{"":<40} {"old ns":>12} {"new ns":>12} {"ratio":>7}', file=out)
+    for key, ns in new.items():
+        if key not in old: continue
+        ratio = ns / old[key]
+        mark = ''
+        if ratio > 1 + threshold: mark = ' slower' ; slower.append(key)
+        elif ratio < 1 / (1 + threshold): mark = ' faster'
+        print(f'{key:<40} {old[key]:>12.1f} {ns:>12.1f} {ratio:>7.2f}{mark}',
+              file=out)
+    return slower
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog='python -m bench')
+    parser.add_argument('-k', dest='select', default='',
+                        help='名前にこの文字列を含む計測だけ実行する')
+    parser.add_argument('--full', action='store_true',
+                        help='1Mオブジェクトの計測も実行する')
+    parser.add_argument('--json', help='結果を保存するファイル')
+    parser.add_argument('--compare', help='比較する以前の結果のファイル')
+    parser.add_argument('--threshold', type=float, default=.1,
+                        help='遅くなったとみなす割合(既定: 0.1)')
+    a = parser.parse_args(argv)
+    results = run(a.select, a.full)
+    if a.json:
+        with open(a.json, 'w') as f:
+            json.dump({'environment': environment(), 'results': results},
+                      f, indent=1)
+    if a.compare:
+        with open(a.compare) as f: old = json.load(f)['results']
+        print()
+        slower = compare(old, results, a.threshold)
+        if slower: sys.exit(1)
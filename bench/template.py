@@ -0,0 +1,39 @@
+# coding: utf-8
+'''
+# ひな形からの生成
+100万体を生成したときの1体あたりのバイト数と生成時間を、
+通常のクラス、compact=Trueのクラス、GameObject.template()で比較します。
+```bash
+python -m bench.template
+```
+'''
+import gc, time, tracemalloc
+from game_status import *
+from .memory import make_class
+
+COUNT = 1000000
+
+def measure(factory, count=COUNT) -> tuple[float, float]:
+    """(1体あたりのバイト数, 1体あたりの生成時間)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    objs = [factory() for _ in range(count)]
+    sec = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return (after - before) / count, sec / count
+
+def main():
+    print(f'{"stats":>6} {"kind":>9} {"B/obj":>8} {"us/spawn":>9}')
+    for n in (4, 16, 64):
+        kinds = (("dict", make_class(n, False)),
+                 ("compact", make_class(n, True)),
+                 ("template", make_class(n, True).template()))
+        for kind, cls in kinds:
+            size, sec = measure(cls)
+            print(f'{n:>6} {kind:>9} {size:>8.0f} {sec*1e6:>9.2f}')
+
+if __name__ == '__main__': main()
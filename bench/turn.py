@@ -0,0 +1,38 @@
+# coding: utf-8
+'''
+# ターン経過の速度
+ステータス数と、そのうちturn効果を持つ数を変えてturn()の回数/秒を計測します。
+比較として、クラスの属性を毎回走査していた以前の手順も計測します。
+```bash
+python -m bench.turn
+```
+'''
+from game_status import *
+from game_status.bases import StatBase
+from . import best
+
+def make_class(n:int, ticking:int) -> type:
+    """n個のPointのうちticking個がターンごとに減少するクラス"""
+    ns = {}
+    for i in range(n):
+        if i < ticking: ns[f's{i}'] = Point(arg(100), turn(-1))
+        else: ns[f's{i}'] = Point(arg(100))
+    return type(f'Turn{n}_{ticking}', (GameObject,), ns)
+
+def turn_scan(obj):
+    """クラスの属性を毎回走査する以前の手順"""
+    obj._pre_turn()
+    for n, v in vars(type(obj)).items():
+        if isinstance(v, StatBase): obj._turn_act(n)
+    obj._turn_buffs()
+    obj._post_turn()
+
+def main():
+    print(f'{"stats":>6} {"ticking":>8} {"planned turn/s":>15} {"scan turn/s":>12}')
+    for n, ticking in ((10, 1), (10, 10), (100, 1), (100, 10), (100, 100)):
+        obj = make_class(n, ticking)()
+        planned = best(obj.turn, number=1000)
+        scan = best(lambda: turn_scan(obj), number=1000)
+        print(f'{n:>6} {ticking:>8} {1/planned:>15,.0f} {1/scan:>12,.0f}')
+
+if __name__ == '__main__': main()
@@ -0,0 +1,41 @@
+# coding: utf-8
+'''
+# ワールドの並列化
+World.turn()一回の時間を、ワーカー数を1からCPU数まで変えて計測します。
+```bash
+python -m bench.world          # 100000オブジェクト
+python -m bench.world 1000000
+```
+'''
+import os, sys, time
+from game_status import *
+from game_status.world import World
+
+class Monster(GameObject):
+    STR = Value(arg(10), minim(0))
+    HP_max = (STR + 1) * 10
+    HP = Point(arg(HP_max), minim(0), maxim(HP_max), turn(-1))
+    MP = Point(arg(50), minim(0), maxim(100), turn(1))
+    regen = Calc(min, STR, 5)
+    SP = Point(arg(0), minim(0), maxim(1000), turn(regen))
+
+def tick(world, ticks=5) -> float:
+    world.turn() # 最初の一回は除く
+    start = time.perf_counter()
+    for _ in range(ticks): world.turn()
+    return (time.perf_counter() - start) / ticks
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    serial = tick(World(Monster(STR=i % 20) for i in range(n)))
+    print(f'{"workers":>8} {"ms/tick":>9} {"speedup":>8}')
+    print(f'{"serial":>8} {serial*1e3:>9.1f} {1:>8.2f}')
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        world = World(Monster(STR=i % 20) for i in range(n))
+        with world.start(workers):
+            sec = tick(world)
+        print(f'{workers:>8} {sec*1e3:>9.1f} {serial/sec:>8.2f}')
+        workers *= 2
+
+if __name__ == '__main__': main()
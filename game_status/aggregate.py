@@ -0,0 +1,238 @@
+# coding: utf-8
+'''
+# 集計ステータス値
+- class Members
+  - ほかのGameObjectをメンバーとして持つ属性
+- class Sum, Count, Min, Max, Mean
+  - メンバーのステータス値を集計するステータス値
+
+集計値はメンバーの`_listen`で書き換えを受け取り、変わったメンバーの分だけを
+差し引きして保ちます(MinとMaxはソート済みの列で保ちます)。
+メンバーの出入りや集計値の変化は所持者の`_stat_changed`で通知されるので、
+集計値を使う計算式(Calc)や`maxim`などの効果、memoizeやtrackもそのまま働きます。
+集計は一度読み出されてから保たれ始めます。
+'''
+from .stats import Stat
+from .index import _SortedKeys
+
+class Members:
+    """# メンバー
+    ```python
+    from game_status.aggregate import Members, Sum, Max, Mean
+
+    class Party(GameObject):
+        members = Members()
+        total_STR = Sum("members", "STR")
+        level = Mean("members", "level", default=0)
+        aura = Max("members", "aura", default=0)
+        power = total_STR * 2 + aura # 計算式にも使える
+
+    party = Party()
+    party.members.append(hero)
+    party.members = [hero, mage] # 入れ替え
+    hero.STR += 1 # party.total_STRとpowerが変わる
+    ```
+    """
+    def __set_name__(self, cls, name):
+        self._name = name
+        self._lname = f'_{cls.__name__}__{name}_m'
+    def __get__(self, obj, cls=None):
+        if obj is None: return self
+        res = getattr(obj, self._lname, None)
+        if res is None:
+            res = MemberList(obj, self._name)
+            setattr(obj, self._lname, res)
+        return res
+    def __set__(self, obj, members):
+        self.__get__(obj)[:] = members
+
+class MemberList(list):
+    """# メンバーのリスト
+    中身が変わると、このリストを集計している所持者のステータス値を更新します。
+    同じオブジェクトを二度加えることはできません。"""
+    def __init__(self, owner, name:str):
+        super().__init__()
+        self._owner = owner
+        self._name = name
+        self._ids = set()
+        self._states = {} # {集計ステータス名: (集計ステータス, _State(作り直すまではNone))}
+    def __reduce__(self):
+        # メンバーの_listenersは各メンバーと一緒に保存されるので、中身と集計の名前だけを戻す
+        return (MemberList, (self._owner, self._name), (list(self), tuple(self._states)))
+    def __setstate__(self, state):
+        members, names = state
+        super().extend(members)
+        self._ids = {id(m) for m in self}
+        cls = type(self._owner)
+        for n in names: # 集計の状態はidを使うので、次に読み出されたときに作り直す
+            self._states[n] = (getattr(cls, n), None)
+
+    # 変更
+    def append(self, m):
+        self._check(m)
+        super().append(m) ; self._changed((m,), ())
+    def extend(self, ms):
+        for m in ms: self.append(m)
+    def __iadd__(self, ms):
+        self.extend(ms)
+        return self
+    def insert(self, i, m):
+        self._check(m)
+        super().insert(i, m) ; self._changed((m,), ())
+    def remove(self, m):
+        super().remove(m) ; self._changed((), (m,))
+    def pop(self, i=-1):
+        res = super().pop(i) ; self._changed((), (res,))
+        return res
+    def clear(self):
+        old = list(self)
+        super().clear() ; self._changed((), old)
+    def __setitem__(self, i, ms):
+        old = list(self)
+        super().__setitem__(i, ms)
+        self._replaced(old)
+    def __delitem__(self, i):
+        old = list(self)
+        super().__delitem__(i)
+        self._replaced(old)
+    def __imul__(self, n): raise TypeError("メンバーは複製できません。")
+    def _check(self, m):
+        if id(m) in self._ids: raise Exception("すでにメンバーです。")
+    def _replaced(self, old):
+        new = {id(m): m for m in self}
+        if len(new) != len(self):
+            super().__setitem__(slice(None), old)
+            raise Exception("同じオブジェクトを二度加えることはできません。")
+        oldd = {id(m): m for m in old}
+        self._changed([m for i, m in new.items() if i not in oldd],
+                      [m for i, m in oldd.items() if i not in new])
+
+    def _changed(self, added, removed):
+        for m in removed:
+            self._ids.discard(id(m))
+            m._unlisten(self._member_changed)
+        for m in added:
+            self._ids.add(id(m))
+            m._listen(self._member_changed)
+        owner = self._owner
+        for agg, state in self._states.values():
+            if state is not None:
+                for m in removed: state.remove(m)
+                for m in added: state.add(m)
+            if added or removed: owner._stat_changed(agg._name)
+    def _member_changed(self, m, name, deps):
+        owner = self._owner
+        for agg, state in self._states.values():
+            if name in agg._trigger_names(type(m)) and (state is None or state.update(m)):
+                owner._stat_changed(agg._name)
+    def _state(self, agg:'Aggregate'):
+        res = self._states.get(agg._name)
+        if res is None or res[1] is None:
+            state = agg._new_state()
+            for m in self: state.add(m)
+            res = self._states[agg._name] = (agg, state)
+        return res[1]
+
+
+# 集計の状態
+class _SumState:
+    def __init__(self, source, func):
+        self.source, self.func = source, func
+        self.total = 0
+        self.values = {} # {id(member): 値}
+    def __len__(self): return len(self.values)
+    def _read(self, m):
+        return self.func(m if self.source is None else getattr(m, self.source))
+    def add(self, m):
+        v = self.values[id(m)] = self._read(m)
+        self.total += v
+    def remove(self, m): self.total -= self.values.pop(id(m))
+    def update(self, m) -> bool:
+        old, new = self.values[id(m)], self._read(m)
+        if new == old: return False
+        self.values[id(m)] = new
+        self.total += new - old
+        return True
+
+class _OrderState:
+    def __init__(self, source):
+        self.source = source
+        self.keys = {} # {id(member): (値, id(member))}
+        self.sorted = _SortedKeys()
+    def __len__(self): return len(self.keys)
+    def add(self, m):
+        k = self.keys[id(m)] = (getattr(m, self.source), id(m))
+        self.sorted.add(k)
+    def remove(self, m): self.sorted.remove(self.keys.pop(id(m)))
+    def update(self, m) -> bool:
+        old = self.keys[id(m)]
+        new = (getattr(m, self.source), id(m))
+        if new == old: return False
+        self.sorted.remove(old) ; self.sorted.add(new)
+        self.keys[id(m)] = new
+        return True
+
+
+# 集計ステータス値
+def _identity(v): return v
+
+class Aggregate(Stat):
+    """メンバーのステータス値sourceを集計する(メンバーがいなければdefault)
+    既定では合計を保ちます。サブクラスは`_new_state`と`_value`で集計の仕方を変えます。"""
+    def __init__(self, members:str, source:str, default=None):
+        self._members = members
+        self._source = source
+        self._default = default
+        self._triggers = {} # {メンバーの型: 書き換えられると集計し直すステータス名}
+    def __get__(self, obj, cls=None):
+        if obj is None: return self
+        state = getattr(obj, self._members)._state(self)
+        if not state: return self._default
+        return self._value(state)
+    def _trigger_names(self, cls) -> frozenset:
+        res = self._triggers.get(cls)
+        if res is None:
+            source = self._source
+            res = self._triggers[cls] = frozenset(
+                n for n, ds in cls._dependents.items() if source in ds)
+        return res
+    def _new_state(self):
+        """メンバーの出入りと書き換えを受け取る集計の状態"""
+        return _SumState(self._source, _identity)
+    def _value(self, state):
+        """集計の状態からの値(メンバーが一人以上のときだけ呼ばれる)"""
+        return state.total
+    def __repr__(self):
+        if self._has_name: return self._name
+        return f'{type(self).__name__}({self._members!r}, {self._source!r})'
+
+class Sum(Aggregate):
+    """合計"""
+    def __init__(self, members:str, source:str, default=0):
+        super().__init__(members, source, default)
+
+class Count(Aggregate):
+    """メンバーの数(sourceを指定すると、その値が真のメンバーの数)"""
+    def __init__(self, members:str, source:str|None=None):
+        super().__init__(members, source, 0)
+    def _new_state(self):
+        return _SumState(self._source, _one if self._source is None else _truth)
+    def _trigger_names(self, cls):
+        if self._source is None: return frozenset()
+        return super()._trigger_names(cls)
+def _one(v): return 1
+def _truth(v): return 1 if v else 0
+
+class Mean(Aggregate):
+    """平均"""
+    def _value(self, state): return state.total / len(state.values)
+
+class Min(Aggregate):
+    """最小値"""
+    def _new_state(self): return _OrderState(self._source)
+    def _value(self, state): return next(state.sorted.irange())[0]
+
+class Max(Aggregate):
+    """最大値"""
+    def _new_state(self): return _OrderState(self._source)
+    def _value(self, state): return next(state.sorted.irange_reversed())[0]
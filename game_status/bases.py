@@ -9,6 +9,8 @@
   - ステータスを所持するオブジェクトの基本クラス
 - class GameObject
   - ゲームオブジェクトの素体
+- class BuffList
+  - 変更を所持者に通知するバフのリスト
 - class StatEffect
   - ステータス値への効果
 - def getval(VALUELIKE, STATS, type[STATS])
@@ -16,7 +18,7 @@
 - def getdep(VALUELIKE)
   - ステータスの依存関係を取得する
 '''
-import abc, functools as fts
+import abc, types, contextlib
 import graphlib
 
 import typing, collections.abc as ctyping
@@ -78,11 +80,7 @@ class StatAct:
         def name(self): return self._func.__name__
         def register(self, cls, sname):
             """ステータスクラスに適用"""
-            if not hasattr(cls, self.name):
-                setattr(cls, self.name, StatAct())
-            statact = getattr(cls, self.name)
-            assert isinstance(statact, StatAct)
-            statact.register(sname, self)
+            StatAct._own(cls, self.name).register(sname, self)
         def __call__(self, obj, *a, **ka):
             return self._func(obj, *a, **ka)
         
@@ -117,23 +115,52 @@ class StatAct:
         
         def register(self, cls, sname, managed_obj):
             """ステータスクラスに適用"""
-            if not hasattr(cls, self.name):
-                setattr(cls, self.name, StatAct())
-            statact = getattr(cls, self.name)
-            assert isinstance(statact, StatAct)
-            statact.register(sname, fts.partial(self, managed_obj))
+            StatAct._own(cls, self.name).register(
+                sname, types.MethodType(self._func, managed_obj))
         def __call__(self, iself, obj, *a, **ka):
             return self._func(iself, obj, *a, **ka)
     
+    _attr = "" # クラスでの属性名
+    _owner = None # 属性として持つクラス
     def __init__(self, default=None):
         self._acts = {}
         if default is None:
             self._default = (lambda name, *a, **ka: None)
         else:
             self._default = default
+    def __set_name__(self, cls, name): self._attr, self._owner = name, cls
     def register(self, name, act):
-        """操作を登録する"""
-        self._acts |= {name:act}
+        """操作を登録する
+        クラス定義の後の登録は、このStatActを使うクラスの手順(_init_planなど)に反映されます。"""
+        self._acts[name] = act
+        owner = self._owner
+        if owner is not None and "_init_plan" in vars(owner):
+            for c in (owner, *_subclasses(owner)):
+                if getattr(c, self._attr, None) is self: c._build_plans()
+    @staticmethod
+    def _own(cls, name) -> 'StatAct':
+        """クラス自身のStatActを取得する
+        継承したものしかなければ複製して設定するので、登録がほかのクラスに漏れません。"""
+        statact = vars(cls).get(name)
+        if statact is None:
+            statact = getattr(cls, name, None)
+            statact = StatAct() if statact is None else statact._derive()
+            statact._attr, statact._owner = name, cls
+            setattr(cls, name, statact)
+        assert isinstance(statact, StatAct)
+        return statact
+    def _derive(self) -> 'StatAct':
+        """登録内容を引き継いだ複製を作る"""
+        res = StatAct(self._default)
+        res._acts = dict(self._acts)
+        res._attr = self._attr
+        return res
+    def bind(self, name):
+        """名前に対応する処理を、(obj, *a, **ka)で呼び出せる形で返す"""
+        if name in self._acts: return self._acts[name]
+        default = self._default
+        def call(obj, *a, **ka): return default(obj, name, *a, **ka)
+        return call
     def callwith(self,
                 obj,
                 func:ctyping.Callable[
@@ -143,16 +170,66 @@ class StatAct:
         for k, v in self._acts.items():
             a, ka = func(k)
             yield v(obj, *a, **ka)
+    @staticmethod
+    def apply_many(attr:str, items:ctyping.Iterable[tuple]) -> int:
+        """# まとめて呼び出す
+        `(obj, name, *引数)`の並びに、各オブジェクトのクラスのStatAct`attr`を適用します。
+        処理はクラスごとに一度だけ引き、登録のない名前はデフォルト処理も呼ばずに飛ばします。
+        適用した数を返します。
+        ```python
+        StatAct.apply_many("gainexp", [(p, "STR", 10), (q, "DEX", 5)])
+        ```"""
+        resolved = {} # {type: {name: 処理}}
+        count = 0
+        for obj, name, *a in items:
+            cls = type(obj)
+            acts = resolved.get(cls)
+            if acts is None: acts = resolved[cls] = _acts_of(cls, attr)
+            act = acts.get(name)
+            if act is not None:
+                act(obj, *a)
+                count += 1
+        return count
+    @staticmethod
+    def apply_all(attr:str, objs:ctyping.Iterable, names:ctyping.Iterable[str],
+                  *a, **ka) -> int:
+        """すべてのオブジェクトのすべての名前に同じ引数でStatAct`attr`を適用する
+        ```python
+        StatAct.apply_all("gainexp", raid, ("STR", "DEX", "AGI"), 10)
+        ```"""
+        names = tuple(names)
+        resolved = {} # {type: (処理, ...)}
+        count = 0
+        for obj in objs:
+            cls = type(obj)
+            acts = resolved.get(cls)
+            if acts is None:
+                found = _acts_of(cls, attr)
+                acts = resolved[cls] = tuple(
+                    found[n] for n in names if n in found)
+            for act in acts: act(obj, *a, **ka)
+            count += len(acts)
+        return count
     def keys(self): return self._acts.keys()
     def values(self): return self._acts.values()
     def items(self): return self._acts.items()
     def __get__(self, obj, cls=None):
         if obj is None: return self
         def call(name, *a, **ka):
-            if name in self._acts: self._acts[name](obj, *a, **ka)
-            else: self._default(obj, name, *a, **ka)
+            if name in self._acts: return self._acts[name](obj, *a, **ka)
+            return self._default(obj, name, *a, **ka)
         return call
 
+def _subclasses(cls) -> list[type]:
+    """すべての子孫クラス"""
+    res = []
+    for c in cls.__subclasses__(): res += [c] + _subclasses(c)
+    return res
+def _acts_of(cls, attr:str) -> dict:
+    """クラスのStatActに登録された処理 {name: 処理}"""
+    statact = getattr(cls, attr, None)
+    return statact._acts if isinstance(statact, StatAct) else {}
+
 class StatBase(typing.Generic[STATS, SVAL]):
     '''# ステータス値のディスクリプタ
     HasStatusが想定するステータスの実装
@@ -160,9 +237,12 @@ class StatBase(typing.Generic[STATS, SVAL]):
     @property
     def _name(self) -> str: return self.__name
     @property
-    def _has_name(self) -> bool: return "_StatBase__name" in dir(self)
+    def _has_name(self) -> bool: return "_StatBase__name" in vars(self)
     @property
     def _dependencies(self) -> set[str]: return set()
+    def _storage(self) -> tuple[str, ...]:
+        """インスタンスに保存する裏側の値の属性名"""
+        return ()
     def __set_name__(self, cls:type[STATS], name:str):
         """宣言時に呼び出される"""
         self.__name = name
@@ -177,7 +257,59 @@ class StatBase(typing.Generic[STATS, SVAL]):
             if not callable(v)) + ")"
         return res
 
-class HasStatus:
+def _toposort(graph) -> tuple[str, ...]:
+    """依存先が先に来るように並べる(宣言順をなるべく保つ)"""
+    order, state = [], {} # state: {name: 1(探索中) | 2(済)}
+    for root in graph:
+        if root in state: continue
+        state[root] = 1
+        stack = [(root, iter(graph.get(root, ())))]
+        while stack:
+            node, deps = stack[-1]
+            for d in deps:
+                s = state.get(d)
+                if s is None:
+                    state[d] = 1
+                    stack.append((d, iter(graph.get(d, ()))))
+                    break
+                if s == 1: raise graphlib.CycleError("cycle", d)
+            else:
+                stack.pop()
+                state[node] = 2
+                order.append(node)
+    return tuple(order)
+def _reverse_closure(graph, ordered):
+    """依存グラフから、各ノードに(推移的に)依存しているノードの一覧を作る"""
+    rev = {}
+    for k, deps in graph.items():
+        for d in deps: rev.setdefault(d, []).append(k)
+    res = {}
+    for n in reversed(ordered):
+        found = {n: None}
+        for k in rev.get(n, ()): found |= dict.fromkeys(res[k])
+        res[n] = tuple(found)
+    return res
+
+class _Dependents:
+    """クラスの_dependentsを初めて使うときに組み立てる
+    依存しているものの一覧は大きくなりうるので、クラス定義のときには作りません。"""
+    def __get__(self, obj, cls=None):
+        if obj is not None: cls = type(obj)
+        res = _reverse_closure(cls._dependency_graph, cls._init_order)
+        if vars(cls).get("_dependents") is self: cls._dependents = res
+        return res
+
+class _StatusType(type):
+    """compact=Trueのクラスを、裏側の値を__slots__に並べたクラスとして作り直す
+    __slots__はクラスを作るときにしか決められないので、一度作って配置(_layout)を
+    調べてから、同じ名前空間に__slots__を加えてもう一度作ります。"""
+    def __new__(mcls, name, bases, ns, **ka):
+        cls = super().__new__(mcls, name, bases, ns, **ka)
+        if not cls._compact or "__slots__" in ns: return cls
+        ns = dict(ns, __slots__=cls._compact_slots())
+        return super().__new__(mcls, name, bases, ns, **ka)
+
+class HasStatus(metaclass=_StatusType):
     """# ステータスを所持するオブジェクトの基本クラス
     ステータス値の依存関係グラフをチェックし、正しい順番で初期化します。
     
@@ -196,37 +328,204 @@ class HasStatus:
     assert obj.A == 200
     assert obj.B == 200
     ```
+    ## メモ化
+    `memoize=True`を指定すると、計算した値をインスタンスごとに記憶します。
+    ステータス値が書き換えられると、それに依存する値の記憶だけが破棄されます。
+    読み出し時の効果を持つバフのステータス値が書き換えられたときは、
+    そのバフが効果を持つbuffed()のステータス値とそれに依存する値が破棄されます。
+    ```python
+    class Status(GameObject, memoize=True):
+        STR = Value(arg(0), buffed())
+        HP_max = (STR + 1) * 10 # STRが変わるまで再計算されない
+    ```
+    ## コンパクトな配置
+    `compact=True`を指定すると、生成時に必ず書かれる裏側の値(`_Cls__name_v`)とバフのリストなどを
+    `__slots__`に並べてクラスを作ります。成長の潜在値のようにまれにしか書かれない属性は、
+    最初に書かれたときに作られる`__dict__`に入るので、多くのインスタンスは`__dict__`を持ちません
+    (`python -m bench.memory`)。
+    ```python
+    class Monster(GameObject, compact=True):
+        STR = Value(arg(0), grow())
+    m = Monster()
+    assert type(m) is Monster and "_Monster__STR_v" in Monster.__slots__
+    ```
+    ## 変更の追跡
+    `track=True`(または追跡するステータス名の一覧)を指定すると、
+    書き換えられたステータス値と、依存関係からそれに連動する計算値を記録します。
+    `changes()`は前回の呼び出しから値が変わったものだけを返します。
+    ```python
+    class Player(GameObject, track=True):
+        STR = Value(arg(1))
+        HP_max = (STR + 1) * 10
+    p = Player()
+    p.changes() # 最初はすべて {"STR": 1, "HP_max": 20}
+    p.STR = 2
+    p.changes() # {"STR": 2, "HP_max": 30}
+    data = snapshot.encode_changes(Player, p.changes()) # 送信用
+    ```
     """
+    __slots__ = ()
+    _memoize = False
+    _compact = False
+    _track = False
+    _instance_slots = () # compactのとき__slots__に加える、生成時に必ず書かれる属性名
     @StatAct
     def _init(self, name, value):
         """初期化時の値指定"""
     @StatAct
     def _default_init(self, name):
         """初期化時に引数が指定されなかったときの値指定"""
+    @StatAct
+    def _turn_act(self, name:str):
+        """ターン経過時の各ステータス値に対する処理"""
     def __init__(self, **ka):
-        ordered = graphlib.TopologicalSorter(
-            self._dependency_graph).static_order()
-        for n in ordered:
-            if n in ka: self._init(n, ka[n])
-            else: self._default_init(n)
+        if self._memoize: self._memo = {}
+        if self._tracked: self._start_tracking()
+        for n, init, default_init in self._init_plan:
+            if n in ka: init(self, ka[n])
+            else: default_init(self)
     _dependency_graph = {} # {name: {other, ...}, ...}
-    def __init_subclass__(cls):
+    _dependents = _Dependents() # {name: (name, 依存しているもの, ...), ...}
+    _init_order = () # 依存関係を解決した初期化順
+    _init_plan = () # ((name, _init, _default_init), ...)
+    _turn_plan = () # (_turn_act, ...) 登録のあるステータス値のみ
+    _layout = {} # {裏側の値の属性名: ステータス名}
+    _tracked = () # 変更を追跡するステータス名(初期化順)
+    _track_index = {} # {name: _trackedでの番号}
+    _state_attrs = () # 裏側の値以外に保存が必要な属性名(snapshot)
+    def __init_subclass__(cls, memoize=None, compact=None, track=None,
+                          order=None, **ka):
+        """orderには依存関係を解決済みの初期化順を渡せます(schemaのキャッシュ用)"""
+        super().__init_subclass__(**ka)
+        if memoize is not None: cls._memoize = memoize
+        if track is not None: cls._track = track
+        if compact is not None: cls._compact = compact
+        graph = dict(cls._dependency_graph)
         for k, v in tuple(vars(cls).items()):
-            if isinstance(v, StatBase):
-                cls._dependency_graph = (
-                    cls._dependency_graph |
-                    {k:v._dependencies})
-        try: graphlib.TopologicalSorter(cls._dependency_graph).prepare()
-        except graphlib.CycleError:
-            raise Exception("依存関係の循環を検知しました。")
+            if isinstance(v, StatBase): graph[k] = v._dependencies
+        cls._dependency_graph = graph
+        if order is not None: cls._init_order = tuple(order)
+        else:
+            try: cls._init_order = _toposort(graph)
+            except graphlib.CycleError:
+                raise Exception("依存関係の循環を検知しました。")
+        cls._dependents = _Dependents()
+        cls._layout = {}
+        for n in cls._dependency_graph:
+            stat = getattr(cls, n, None)
+            if isinstance(stat, StatBase):
+                for a in stat._storage(): cls._layout.setdefault(a, n)
+        cls._build_plans()
+        cls._build_tracked()
+    @classmethod
+    def _build_plans(cls):
+        """StatActの登録から決まる手順を組み立てる
+        クラス定義の後の登録ではStatAct.registerから呼び直されます。"""
+        cls._build_init_plan()
+        cls._build_turn_plan()
+    @classmethod
+    def _build_init_plan(cls):
+        """初期化の手順をクラスごとに組み立てる"""
+        init, default_init = cls._init, cls._default_init
+        noop = (init._default is vars(HasStatus)["_init"]._default and
+            default_init._default is vars(HasStatus)["_default_init"]._default)
+        cls._init_plan = tuple(
+            (n, init.bind(n), default_init.bind(n))
+            for n in cls._init_order
+            if not noop or n in init.keys() or n in default_init.keys())
+    @classmethod
+    def _build_turn_plan(cls):
+        """ターン経過時に呼び出す処理の一覧を組み立てる
+        基底クラスのステータス値も含め、_turn_actに登録があるものだけを並べます。"""
+        acts = cls._turn_act
+        cls._turn_plan = tuple(
+            acts.bind(n) for n in cls._dependency_graph if n in acts.keys())
+    @classmethod
+    def _build_tracked(cls):
+        """変更を追跡するステータス名を決める"""
+        track = cls._track
+        if not track: cls._tracked = ()
+        else:
+            graph = cls._dependency_graph
+            names = graph if track is True else set(track)
+            for n in names:
+                if n not in graph:
+                    raise Exception(f"追跡するステータス値{n}がありません。")
+            cls._tracked = tuple(n for n in cls._init_order if n in names)
+        cls._track_index = {n: i for i, n in enumerate(cls._tracked)}
+    @classmethod
+    def _blank(cls):
+        """初期化(argやdefault)を通さずに空のインスタンスを作る"""
+        obj = cls.__new__(cls)
+        if cls._memoize: obj._memo = {}
+        if cls._tracked: obj._start_tracking()
+        return obj
+    @classmethod
+    def _compact_slots(cls):
+        """compactのときに加える__slots__
+        生成時に必ず書かれる値だけをスロットに置き、まれにしか書かれない属性
+        (成長の潜在値やリスナー、クラスに既定値のあるものなど)は、
+        最初に書かれたときに作られる__dict__に入れます。"""
+        names = dict.fromkeys(
+            a for a, n in cls._layout.items()
+            if vars(getattr(cls, n)).get("_vname") == a) # ValueやPointの値
+        for c in reversed(cls.__mro__):
+            names |= dict.fromkeys(vars(c).get("_instance_slots", ()))
+        if cls._memoize: names["_memo"] = None
+        if cls._tracked: names |= dict.fromkeys(("_dirty", "_synced"))
+        names["__dict__"] = None
+        for c in cls.__mro__:
+            for a in vars(c).get("__slots__", ()): names.pop(a, None)
+        return tuple(names)
+    def _stat_changed(self, name:str):
+        """ステータス値が書き換えられたときに呼ばれる"""
+        if self._memoize:
+            memo = self._memo
+            for n in self._dependents.get(name, (name,)): memo.pop(n, None)
+        if self._tracked:
+            dirty = self._dirty
+            for n in self._dependents.get(name, (name,)): dirty[n] = None
+        if self._listeners:
+            deps = self._dependents.get(name, (name,))
+            for f in self._listeners: f(self, name, deps)
+    _listeners = None # [(obj, name, 連動するステータス名) -> None, ...]
+    def _listen(self, func):
+        """ステータス値が書き換えられたときに呼ぶ関数を加える"""
+        if self._listeners is None: self._listeners = []
+        self._listeners.append(func)
+    def _unlisten(self, func):
+        self._listeners.remove(func)
+        if not self._listeners: self._listeners = None
+    def _start_tracking(self):
+        self._dirty = dict.fromkeys(self._tracked) # 最初はすべて送る
+        self._synced = {}
+    def changes(self) -> dict:
+        """前回の呼び出しから値が変わった追跡対象のステータス値 {name: 新しい値}
+        書き換えられても前回と同じ値に戻っていれば含まれません。"""
+        dirty = self._dirty
+        if not dirty: return {}
+        self._dirty = {}
+        synced, tracked = self._synced, self._track_index
+        res = {}
+        for n in dirty:
+            if n not in tracked: continue
+            v = getattr(self, n)
+            old = synced.get(n, _UNSYNCED)
+            if type(old) is type(v) and old == v: continue
+            synced[n] = res[n] = v
+        return res
     def __repr__(self):
+        state = self.__getstate__() or {}
+        if type(state) is tuple: state = (state[0] or {}) | state[1] # (__dict__, スロット)
         res = self.__class__.__name__
         res += "(" + ', '.join(
             f'{k}= {repr(v)}'
-            for k, v in vars(self).items()
+            for k, v in state.items()
             if not callable(v)) + ")"
         return res
 
+_UNSYNCED = object()
+
 class GameObject(HasStatus):
     """# ゲームオブジェクトの素体
     このクラスを継承し各ステータス値を設定することで、キャラやアイテムの動作を作ります。いろいろと実装を含むので、もしそれが気に食わないなら集約で所持することをお勧めします。
@@ -254,28 +553,269 @@ class GameObject(HasStatus):
         def is_rotten(self): return self.freshness < 0
     ```"""
     
+    __slots__ = ()
+    turn_period = 1 # Schedulerがturn()を呼ぶ間隔(Noneなら起こされるまで眠る)
+    _instance_slots = ("_buffs",)
     def __init__(self, buffs=(), /, **ka):
-        self._buffs = list(buffs)
+        self._buffs = BuffList(self, buffs)
         super().__init__(**ka)
+    _buffed_stats = frozenset() # buffed()を持つステータス値の名前
+    _buff_index = None # {name: [そのステータス値に効果を持つバフ, ...]}
+    @classmethod
+    def _build_plans(cls):
+        super()._build_plans()
+        if hasattr(cls, "addbuff"):
+            cls._buffed_stats = frozenset(cls.addbuff.keys())
+
+    @classmethod
+    def _blank(cls, buffs=()):
+        obj = super()._blank()
+        obj._buffs = BuffList(obj, buffs)
+        return obj
+
+    @classmethod
+    def template(cls, name:str|None=None, /, **ka) -> type:
+        """# ひな形(フライウェイト)
+        kaで初期化した裏側の値をクラス属性として持つサブクラスを作ります。
+        インスタンスは書き換えていないステータス値をひな形から読み出し、
+        書き換えたものだけを自身に持ちます(コピーオンライト)。
+        引数なしの生成はステータス値の数によらず一定の時間で済みます。
+        ```python
+        Slime = Monster.template("Slime", STR=3)
+        mobs = [Slime() for _ in range(1000000)] # ほとんどメモリを使わない
+        boss = Slime(STR=20) # 指定した値と、それに依存する値だけを初期化する
+        ```
+        ひな形の値は共有されるので、リストなどをその場で書き換えないでください。
+        サブクラスで定義した`__init__`は呼ばれません。
+        スナップショットから読み込むときは、作ったクラスを`classes`で渡してください。
+        """
+        proto = cls(**ka)
+        ns = {a: getattr(proto, a) for a in cls._layout if hasattr(proto, a)}
+        ns |= {"__module__": cls.__module__,
+               "__qualname__": name or cls.__qualname__,
+               "__init__": _template_init}
+        return type(name or cls.__name__, (cls,), ns,
+                    compact=False, order=cls._init_order)
 
     @property
     def buffs(self) -> list:
         """バフのリスト"""
         return self._buffs
-    @StatAct
-    def _turn_act(self, name:str):
-        """ターン経過時の各ステータス値に対する処理"""
+    def _buffs_for(self, name:str):
+        """ステータス値に効果を持つバフ(リストの順)
+        索引に載せたバフのステータス値が書き換えられると、効果を受けるステータス値に
+        通知します(_buff_stat_changed)。"""
+        index = self._buff_index
+        if index is None:
+            index = self._buff_index = {}
+            for b in self._buffs:
+                keys = _effect_keys(b)
+                if keys: b._listen(self._buff_stat_changed)
+                for n in keys: index.setdefault(n, []).append(b)
+        return index.get(name, ())
+    def _drop_buff_index(self):
+        """バフの索引を捨て、載せていたバフの書き換えの通知をやめる"""
+        index = self._buff_index
+        if index is None: return
+        self._buff_index = None
+        for n, bs in index.items():
+            for b in bs: # 一つ目のステータス名の列で、載せた回数だけやめる
+                if next(iter(_effect_keys(b))) == n:
+                    b._unlisten(self._buff_stat_changed)
+    def _buffs_changed(self, added=None, removed=None, updated=()):
+        """バフのリストが変更されたときに呼ばれる
+        追加・削除されたバフが分からない変更では索引を作り直します。
+        updatedはリストに残ったまま効果が変わったバフです。"""
+        index = self._buff_index
+        if not self._buffed_stats:
+            self._drop_buff_index()
+            return
+        if added is None and removed is None:
+            self._drop_buff_index()
+            names = self._buffed_stats
+        else:
+            names = set()
+            for b in added or ():
+                keys = _effect_keys(b)
+                names |= keys
+                if index is not None and keys:
+                    b._listen(self._buff_stat_changed)
+                    for n in keys: index.setdefault(n, []).append(b)
+            for b in removed or ():
+                keys = _effect_keys(b)
+                names |= keys
+                if index is not None and keys:
+                    b._unlisten(self._buff_stat_changed)
+                    for n in keys: index[n].remove(b)
+            for b in updated: names |= _effect_keys(b)
+            names &= self._buffed_stats
+        self._buffed_changed(names)
+    def _buffed_changed(self, names):
+        """バフの効果が変わったかもしれないステータス値を通知する"""
+        for n in names: self._stat_changed(n)
+    def _buff_stat_changed(self, b, name, deps):
+        """索引に載せたバフのステータス値(効果倍率など)が書き換えられたときに呼ばれる"""
+        self._buffed_changed(_effect_keys(b) & self._buffed_stats)
+
+    # 購読
+    _watchers = None # {name: [callback, ...]}
+    _watched = None # {name: 最後に通知した値}
+    _pending = None # 通知待ちのステータス名 {name: None}
+    _batching = 0 # batch()の入れ子の深さ
+    def watch(self, name:str, callback):
+        """ステータス値が変わったら`callback(obj, name, 新しい値)`を呼ぶ
+        依存先(bonusやmaxim、argの既定値などの効果を通したものも含む)が
+        書き換えられたときも呼ばれます。
+        ```python
+        player.watch("HP", lambda obj, name, v: print(name, v))
+        player.STR += 1 # HP_max経由でHPが変わるので呼ばれる
+        player.turn()   # ターン中に何度変わっても、終わったときに一度だけ
+        ```
+        書き換えごとに、クラスの逆依存表(_dependents)から連動するステータス名を引き、
+        監視しているものだけを読み出して、前回の通知から値が変わっていれば呼びます
+        (`changes()`と同じく、型と==で比べます)。"""
+        if name not in self._dependency_graph:
+            raise Exception(f"監視するステータス値{name}がありません。")
+        if self._watchers is None:
+            self._watchers = {}
+            self._watched = {}
+            self._listen(GameObject._watched_changed)
+        if name not in self._watchers: self._watched[name] = getattr(self, name)
+        self._watchers.setdefault(name, []).append(callback)
+        return callback
+    def unwatch(self, name:str, callback):
+        watchers = self._watchers
+        watchers[name].remove(callback)
+        if not watchers[name]:
+            del watchers[name], self._watched[name]
+        if not watchers:
+            self._watchers = self._watched = None
+            self._unlisten(GameObject._watched_changed)
+    @contextlib.contextmanager
+    def batch(self):
+        """withの間の変更をまとめ、終わったときに監視対象ごとに一度だけ通知する"""
+        self._batching += 1
+        try: yield self
+        finally:
+            self._batching -= 1
+            if not self._batching and self._pending: self._notify_watchers()
+    def _watched_changed(self, name, deps):
+        watchers = self._watchers
+        pending = self._pending
+        for n in deps:
+            if n in watchers:
+                if pending is None: pending = self._pending = {}
+                pending[n] = None
+        if pending and not self._batching: self._notify_watchers()
+    def _notify_watchers(self):
+        while self._pending: # 通知の中で書き換えられたものも続けて通知する
+            pending, self._pending = self._pending, None
+            for n in pending:
+                fs = tuple((self._watchers or {}).get(n, ()))
+                if not fs: continue
+                v, old = getattr(self, n), self._watched.get(n, _UNSYNCED)
+                if type(old) is type(v) and old == v: continue
+                self._watched[n] = v
+                for f in fs: f(self, n, v)
+
     def _pre_turn(self):
         """ターン経過時の一般処理(オーバーライドして使用)"""
     def _post_turn(self):
         """ターン経過後の一般処理(オーバーライドして使用)"""
     def turn(self):
-        """ターン経過時の処理を実行"""
+        """ターン経過時の処理を実行
+        watch()されていれば、ターン中の変更は終わったときにまとめて通知します。"""
+        if self._watchers is not None:
+            with self.batch(): self._turn()
+        else: self._turn()
+    def _turn(self):
         self._pre_turn()
-        for n, v in vars(type(self)).items():
-            if isinstance(v, StatBase): self._turn_act(n)
-        for b in self.buffs[:]: b.turn(self)
+        for act in self._turn_plan: act(self)
+        self._turn_buffs()
         self._post_turn()
+    def advance(self, n:int):
+        """turn()をn回呼んだのと同じ状態へ進める
+        turn効果やバフの効果が一定値の加算なら、nによらずほぼ一定の時間で計算します
+        (game_status.forward)。"""
+        from .forward import advance
+        with self.batch(): advance(self, n)
+    def _turn_buffs(self):
+        """バフのターン経過処理(終了したバフはまとめて取り除く)"""
+        buffs = self._buffs
+        if not buffs: return
+        for b in buffs[:]: b.turn(self)
+        expired = [b for b in buffs if b._expired()]
+        if expired: buffs._discard(expired)
+        if self._memoize or self._tracked or self._listeners:
+            self._buffed_changed(self._buffed_stats)
+
+def _template_init(self, buffs=(), /, **ka):
+    """ひな形の__init__: 指定された値と、それに依存する値だけを初期化する"""
+    self._buffs = BuffList(self, buffs)
+    if self._memoize: self._memo = {}
+    if self._tracked: self._start_tracking()
+    if not ka: return
+    names = set()
+    for n in ka: names.update(self._dependents.get(n, (n,)))
+    for n, init, default_init in self._init_plan:
+        if n in ka: init(self, ka[n])
+        elif n in names: default_init(self)
+
+def _effect_keys(b):
+    """バフが読み出し時の効果(read_effect)を持つステータス値の名前"""
+    effect = getattr(type(b), "read_effect", None)
+    return effect.keys() if isinstance(effect, StatAct) else frozenset()
+
+class BuffList(list):
+    """# バフのリスト
+    中身が変更されると所持者の`_buffs_changed`を呼び出します。
+    追加・削除だけの変更では、変更されたバフも一緒に渡します。
+    スタックするバフ(Buffのstacking)は、同じものがあればそちらに重ねます。"""
+    __slots__ = ("_owner",)
+    def __init__(self, owner, iterable=()):
+        super().__init__(iterable)
+        self._owner = owner
+    def __reduce__(self): return (BuffList, (self._owner, list(self)))
+    def _changed(self, added=None, removed=None, updated=()):
+        self._owner._buffs_changed(added, removed, updated)
+    def _stack_onto(self, b) -> bool:
+        """bを重ねられるバフがあれば重ねる"""
+        if not getattr(b, "_stacking", None): return False
+        key = b._stack_key()
+        for e in self:
+            if e is not b and type(e) is type(b) and e._stack_key() == key:
+                e._push_stack(b)
+                self._changed(added=(), removed=(), updated=(e,))
+                return True
+        return False
+    def append(self, b):
+        if self._stack_onto(b): return
+        super().append(b) ; self._changed(added=(b,))
+    def extend(self, bs):
+        for b in bs: self.append(b)
+    def insert(self, i, b):
+        if self._stack_onto(b): return
+        super().insert(i, b) ; self._changed()
+    def remove(self, b): super().remove(b) ; self._changed(removed=(b,))
+    def pop(self, i=-1):
+        res = super().pop(i) ; self._changed(removed=(res,))
+        return res
+    def clear(self): super().clear() ; self._changed()
+    def sort(self, **ka): super().sort(**ka) ; self._changed()
+    def reverse(self): super().reverse() ; self._changed()
+    def __setitem__(self, i, b): super().__setitem__(i, b) ; self._changed()
+    def __delitem__(self, i): super().__delitem__(i) ; self._changed()
+    def __iadd__(self, bs):
+        self.extend(bs)
+        return self
+    def _discard(self, bs):
+        """まとめて取り除く"""
+        ids = {id(b) for b in bs}
+        super().__setitem__(slice(None), [b for b in self if id(b) not in ids])
+        self._changed(removed=bs)
+    def __imul__(self, n):
+        super().__imul__(n) ; self._changed()
+        return self
 
 VALUELIKE = StatBase[STATS, SVAL] | SVAL
 
@@ -287,5 +827,7 @@ def getval(
     return a
 def getdep(a:VALUELIKE):
     """ステータスの依存関係を取得する"""
-    if isinstance(a, StatBase): return a._dependencies
+    if isinstance(a, StatBase):
+        if a._has_name: return {a._name}
+        return a._dependencies
     return set()
@@ -1,10 +1,11 @@
 
 from .bases import (
     StatAct, STATS, SVAL, VALUELIKE,
-    getval, StatEffect, HasStatus)
-from .stats import Stat, StatBase
+    getval, HasStatus)
+from .stats import Stat, StatBase, StatEffect
 
 from typing import Self, Any
+import heapq
 
 class Buff(HasStatus):
     """## 各ステータス値へのバフを適用する
@@ -23,7 +24,7 @@ class Buff(HasStatus):
 
         # 終了条件(オーバーライドしなければ1ターンのみのバフになります)
         @property
-        def is_disabled(self): return self.effect < 0
+        def is_disabled(self): return self.duration <= 0
     
     # 動作
     class PlayerStat(GameObject):
@@ -38,12 +39,107 @@ class Buff(HasStatus):
     assert player.HP == 90
     assert len(player.buffs) == 0
 
+    ```
+    ## 読み出し時の効果
+    `read_effect`に登録した処理は、対象のbuffed()を持つステータス値を読み出すたびに
+    `(バフ, 対象, 値) -> 新しい値`として呼ばれます。
+    GameObjectはステータス値ごとにバフの索引を持つので、効果のないバフは呼ばれません。
+    ```python
+    @StatAct.actfunc
+    def read_effect(b, obj, val): return val * 2
+    class Rage(buff.Buff): pass
+    read_effect.register(Rage, "STR") # STRを2倍にする
+    ```
+    ## スタック
+    `stacking=True`(または効果時間のステータス名)を指定すると、
+    同じ対象に追加された同じ種類・同じ値のバフは一つにまとめられます。
+    まとめられたバフは重ねた数(`stacks`)だけAddの効果を掛けて一度に適用し、
+    各スタックは追加したときの効果時間のターン数が過ぎると取り除かれます。
+    効果時間のステータス値を持たないクラスに指定するとエラーになります。
+    ```python
+    class Poison(buff.Buff, stacking="duration"):
+        effect = Value(arg(default=1.))
+        duration = Point(arg(3)) # 各スタックの効果時間
+        HP = buff.Add(-effect)
+
+    for _ in range(40): player.buffs.append(Poison()) # リストには一つだけ
+    player.turn() # HPが40減る
     ```"""
+    __slots__ = ()
+    _stacking = None # スタックの効果時間を表すステータス名
+    _stacks = 1
+    _disabled = False # Disableなどで無効になった
+    _act_plan = () # (act, ...) 登録された処理のみ
+    _state_attrs = ("_disabled", "_stacks", "_stack_tick", "_stack_expiry")
+    def __init_subclass__(cls, stacking=None, **ka):
+        super().__init_subclass__(**ka)
+        if stacking is True: stacking = "duration"
+        if stacking is not None: cls._stacking = stacking or None
+        if cls._stacking and cls._stacking not in cls._dependency_graph:
+            raise Exception(f"スタックの効果時間を表すステータス値{cls._stacking}がありません。")
+    @classmethod
+    def _build_plans(cls):
+        super()._build_plans()
+        cls._build_act_plan()
+    @classmethod
+    def _build_act_plan(cls):
+        """対象へ効果を与える処理の一覧を組み立てる"""
+        acts = cls.act
+        cls._act_plan = tuple(acts.bind(n) for n in sorted(acts.keys()))
+    def __init__(self, **ka):
+        super().__init__(**ka)
+        if self._stacking:
+            self._stack_tick = 0
+            self._stack_expiry = [self._stack_duration()]
     def turn(self, stat:STATS):
-        for d in dir(self): self.act(d, stat)
+        """対象への効果を適用し、自身のステータス値のターンを進める
+        終了したバフは対象のturnでまとめて取り除かれます。"""
+        for act in self._act_plan: act(self, stat)
+        for act in self._turn_plan: act(self)
+        if self._stacking: self._expire_stacks(stat)
+    def advance(self, stat:STATS, n:int):
+        """turn(stat)をn回呼んだのと同じ状態へ進める
+        効果が一定値の加算だけなら一ターンずつ進めずに計算します(game_status.forward)。"""
+        from .forward import advance_buff
+        advance_buff(self, stat, n)
     @property
     def is_disabled(self) -> bool: return True
-    effect = StatAct()
+    def _expired(self) -> bool:
+        """対象のバフリストから取り除くか"""
+        if self._stacking: return self._disabled or self._stacks <= 0
+        return self._disabled or self.is_disabled
+    @property
+    def stacks(self) -> int:
+        """重ねられた数"""
+        return self._stacks
+
+    # スタック
+    def _stack_duration(self):
+        return getattr(self, self._stacking)
+    def _stack_key(self):
+        """同じ値なら一つにまとめられる"""
+        return (type(self),) + tuple(
+            getattr(self, n) for n, *_ in self._init_plan
+            if n != self._stacking)
+    def _push_stack(self, other:Self):
+        """同じ種類のバフを一つ重ねる"""
+        self._stacks += 1
+        duration = other._stack_duration()
+        heapq.heappush(self._stack_expiry, self._stack_tick + duration)
+        if duration > self._stack_duration(): # 最も長く残るスタックの効果時間
+            setattr(self, self._stacking, duration)
+    def _expire_stacks(self, stat):
+        self._stack_tick += 1
+        expiry, n = self._stack_expiry, self._stacks
+        while expiry and expiry[0] <= self._stack_tick:
+            heapq.heappop(expiry)
+            self._stacks -= 1
+        if 0 < self._stacks < n: stat._buffs_changed(updated=(self,))
+    @StatAct
+    def read_effect(self, name, obj, val):
+        """対象のステータス値への効果(未登録なら値をそのまま返す)
+        バフのステータス値(効果倍率のeffectなど)と名前がぶつからないようread_effectとしています。"""
+        return val
     act = StatAct()
 
 
@@ -55,11 +151,14 @@ class Add(ActiveBuffStatus):
     '''
     @StatAct.actmethod
     def act(self, obj, stat):
-        setattr(stat, self.__name,
-            getattr(stat, self.__name) +
-            getval(self.__stat, obj, self.__cls))
+        val = getval(self.__stat, obj, self.__cls)
+        if obj._stacks != 1: val = val * obj._stacks
+        setattr(stat, self.__name, getattr(stat, self.__name) + val)
     def __init__(self, stat):
         self.__stat = stat
+    def _linear(self):
+        """(対象のステータス名, 加算値)"""
+        return self.__name, self.__stat
     def __set_name__(self, cls, name):
         self.__name = name
         self.__cls = cls
@@ -69,10 +168,15 @@ class Add(ActiveBuffStatus):
         return getval(self.__stat, obj, cls)
 
 class Disable(ActiveBuffStatus):
+    ''' ## 無効化バフ
+    値が真になるとバフを無効にします。読み出し時の効果はその場で止まり、
+    対象のリストからは対象のturnの終わりに、ほかの終了したバフとまとめて取り除かれます。
+    '''
     @StatAct.actmethod
     def act(self, obj, stat):
-        if getval(self.__stat, obj, self.__cls):
-            stat.buffs.remove(obj)
+        if getval(self.__stat, obj, self.__cls) and not obj._disabled:
+            obj._disabled = True
+            stat._buffs_changed(updated=(obj,))
     def __init__(self, stat):
         self.__stat = stat
     def __set_name__(self, cls, name):
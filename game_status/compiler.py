@@ -0,0 +1,162 @@
+# coding: utf-8
+'''
+# Calcのコンパイル
+- def compile_calc(Calc)
+  - 計算式の木構造を一つの関数に変換する
+
+Calcの木を辿って平坦なPythonコードを生成します。
+- ValueやPointは裏側の値(`_Cls__name_v`)を直接読み出す
+- ステータスに依存しない部分木は定数として畳み込む
+- 同じ構造の部分式は一度だけ計算して使い回す
+
+使い回しは一つのCalcの関数の中だけです。Calcはそれぞれ別の関数になるので、
+同じクラスのほかのステータス値と共通する部分式は、それぞれの関数で計算されます
+(何度も読み出す値はmemoizeで記憶してください)。
+'''
+import operator as op
+from mathobj import rjoins
+from .bases import StatBase
+
+# 畳み込んでよい(副作用のない)関数
+# operatorから名前を挙げて選ぶ(callやsetitemなど副作用のありうるものを含めない)
+_PURE = {id(f): f for f in (
+    op.abs, op.add, op.and_, op.concat, op.contains, op.countOf,
+    op.eq, op.floordiv, op.ge, op.getitem, op.gt, op.index, op.indexOf,
+    op.inv, op.invert, op.is_, op.is_not, op.le, op.lshift, op.lt,
+    op.matmul, op.mod, op.mul, op.ne, op.neg, op.not_, op.or_, op.pos,
+    op.pow, op.rshift, op.sub, op.truediv, op.truth, op.xor,
+    abs, bool, complex, divmod, float, format, int, len,
+    max, min, pow, repr, round, str, sum)}
+
+# 演算子として直接書き出せる関数
+_BINOPS = {id(f): s for f, s in (
+    (op.add, '+'), (op.sub, '-'), (op.mul, '*'), (op.truediv, '/'),
+    (op.floordiv, '//'), (op.mod, '%'), (op.pow, '**'),
+    (op.matmul, '@'), (op.lshift, '<<'), (op.rshift, '>>'),
+    (op.and_, '&'), (op.or_, '|'), (op.xor, '^'),
+    (op.lt, '<'), (op.le, '<='), (op.gt, '>'), (op.ge, '>='),
+    (op.eq, '=='), (op.ne, '!='))}
+_UNOPS = {id(f): s for f, s in (
+    (op.neg, '-'), (op.pos, '+'), (op.invert, '~'), (op.not_, 'not '))}
+
+class _NotConst(Exception): pass
+
+def _const_key(a):
+    """定数の構造キー(0.0と-0.0のように等しくても区別すべき値はreprで分ける)"""
+    t = type(a)
+    if t is float or t is complex: return (t, repr(a))
+    if t is tuple: return (t, tuple(_const_key(x) for x in a))
+    return (t, a)
+
+class Compiler:
+    """# 計算式のコンパイラ
+    一つの関数を生成する間の状態を保持します。
+    StatEffect._inlineから呼び出されるのでこのAPIを使って式を組み立ててください。
+    `inline`がFalseのあいだは、ステータス値を必ずディスクリプタ経由で読み出します(profile)。
+    """
+    inline = True
+    def __init__(self):
+        self._consts = {}
+        self._lines = []
+        self._keys = {} # {id: 構造キー}
+        self._vars = {} # {構造キー: 変数名}
+        self._root = None
+
+    def const(self, value) -> str:
+        """定数を名前空間に登録して名前を返す"""
+        name = f'c{len(self._consts)}'
+        self._consts[name] = value
+        return name
+    def assign(self, expr:str) -> str:
+        """式を新しい局所変数に代入して名前を返す"""
+        name = f't{len(self._lines)}'
+        self._lines.append(f'{name} = {expr}')
+        return name
+
+    def key(self, a):
+        """部分式の構造キー(同じキーなら同じ値になる)"""
+        if id(a) in self._keys: return self._keys[id(a)]
+        from .stats import Calc
+        if type(a) is Calc:
+            res = ('c', self.key(a.func),
+                   tuple(self.key(x) for x in a.args),
+                   tuple((k, self.key(v)) for k, v in a.kwargs.items()))
+        elif isinstance(a, StatBase): res = ('s', id(a))
+        else:
+            try: res = ('k', _const_key(a)) ; hash(res)
+            except TypeError: res = ('k', id(a))
+        self._keys[id(a)] = res
+        return res
+
+    def fold(self, a):
+        """ステータスに依存しない部分木を評価する(できなければ_NotConst)"""
+        from .stats import Calc
+        if type(a) is Calc:
+            if not isinstance(a.func, StatBase) and id(a.func) not in _PURE:
+                raise _NotConst
+            return self.fold(a.func)(
+                *(self.fold(x) for x in a.args),
+                **{k: self.fold(v) for k, v in a.kwargs.items()})
+        if isinstance(a, StatBase): raise _NotConst
+        return a
+
+    def node(self, a) -> str:
+        """部分式を評価するコードを出力し、値を持つ名前を返す"""
+        from .stats import Calc
+        if not isinstance(a, StatBase): return self.const(a)
+        key = self.key(a)
+        if key in self._vars: return self._vars[key]
+        if type(a) is Calc and (self.inline or a is self._root
+                                or not a._has_name): res = self._calc(a)
+        else: res = self._leaf(a)
+        self._vars[key] = res
+        return res
+
+    def _calc(self, a) -> str:
+        try: return self.const(self.fold(a))
+        except _NotConst: pass
+        except Exception: pass # 実行時に同じ例外を出させる
+        if isinstance(a.func, StatBase) or a.func not in rjoins:
+            args = [self.node(x) for x in a.args]
+        else:
+            args = [self.node(x) for x in a.args[::-1]][::-1]
+        kwargs = {k: self.node(v) for k, v in a.kwargs.items()}
+        fid = id(a.func)
+        if not kwargs and len(args) == 2 and fid in _BINOPS:
+            return self.assign(f'{args[0]} {_BINOPS[fid]} {args[1]}')
+        if not kwargs and len(args) == 1 and fid in _UNOPS:
+            return self.assign(f'{_UNOPS[fid]}{args[0]}')
+        return self.assign(f'{self.node(a.func)}(' + ', '.join(
+            args + [f'{k}={v}' for k, v in kwargs.items()]) + ')')
+
+    def _leaf(self, a) -> str:
+        from .stats import Value, Point
+        if not self.inline: pass
+        elif type(a) is Point and '_vname' in vars(a):
+            return self.assign(f'obj.{a._vname}')
+        elif type(a) is Value and '_vname' in vars(a):
+            val = self.assign(f'getattr(obj, {a._vname!r}, None)')
+            for o in a._ops:
+                expr = o._inline(self, val)
+                if expr is None:
+                    val = self.assign(f'{self.const(o)}.get({val}, obj, cls)')
+                elif expr != val: val = self.assign(expr)
+            return val
+        return self.assign(f'{self.const(a)}.__get__(obj, cls)')
+
+    def build(self, a, name='calc_'):
+        """aを評価する関数(obj, cls) -> 値を生成する"""
+        self._root = a
+        res = self.node(a)
+        src = f'def {name}(obj, cls):\n' + ''.join(
+            f'    {l}\n' for l in self._lines) + f'    return {res}\n'
+        ns = dict(self._consts)
+        exec(compile(src, f'<Calc {name}>', 'exec'), ns)
+        func = ns[name]
+        func.__source__ = src
+        return func
+
+def compile_calc(calc):
+    """Calcを平坦な関数(obj, cls) -> 値に変換する"""
+    name = calc._name if calc._has_name else ''
+    return Compiler().build(calc, f'calc_{name}')
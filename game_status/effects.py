@@ -7,11 +7,14 @@ class grow(StatEffect):
     @StatAct.actmethod
     def gainexp(self, obj, exp):
         setattr(obj, self._vname, getattr(obj, self._vname) + exp*self.freq)
-        setattr(obj, self._pname, getattr(obj, self._pname) - exp)
+        setattr(obj, self._pname, getattr(obj, self._pname, 0) - exp)
+        obj._stat_changed(self._name)
     @StatAct.actmethod
     def gainpot(self, obj, pot):
-        setattr(obj, self._pname, getattr(obj, self._pname) + pot)
+        setattr(obj, self._pname, getattr(obj, self._pname, 0) + pot)
+    def _storage(self): return (self._pname,)
     def set_name(self, cls, name):
+        self._name = name
         self._vname = f'_{cls.__name__}__{name}_v'
         self._pname = f'_{cls.__name__}__{name}_p'
         self.gainexp.register(cls, name, self)
@@ -28,12 +31,13 @@ class buffed(StatEffect):
         self._name = name
         self.addbuff.register(cls, name, self)
     def get(self, val, obj, cls):
-        if hasattr(obj, "buffs"):
-            buffs = getattr(obj, "buffs")
+        if hasattr(obj, "_buffs_for"):
+            buffs = obj._buffs_for(self._name)
         else:
-            buffs = []
+            buffs = ()
         for b in buffs:
-            val = b.effect(obj, self._name, val)
+            if b._disabled: continue # Disableで無効になり、取り除かれるのを待っている
+            val = b.read_effect(self._name, obj, val)
         return val
 
 class bonus(StatEffect):
@@ -48,6 +52,9 @@ class bonus(StatEffect):
         self._get_dependency.register(cls, name, self)
     def get(self, val, obj, cls):
         return val + getval(self._attr, obj, cls)
+    def _inline(self, ctx, val):
+        if type(self).get is bonus.get:
+            return f'{val} + {ctx.node(self._attr)}'
     @property
     def dependencies(self): return getdep(self._attr)
 
@@ -56,6 +63,9 @@ class maxim(StatEffect):
     def __init__(self, m): self._m = m
     def get(self, val, obj, cls):
         return min(val, getval(self._m, obj, cls))
+    def _inline(self, ctx, val):
+        if type(self).get is maxim.get:
+            return f'min({val}, {ctx.node(self._m)})'
     @property
     def dependencies(self): return getdep(self._m)
 
@@ -64,6 +74,9 @@ class minim(StatEffect):
     def __init__(self, m): self._m = m
     def get(self, val, obj, cls):
         return max(val, getval(self._m, obj, cls))
+    def _inline(self, ctx, val):
+        if type(self).get is minim.get:
+            return f'max({val}, {ctx.node(self._m)})'
     @property
     def dependencies(self): return getdep(self._m)
 
@@ -82,15 +95,24 @@ class default(StatEffect):
     def dependencies(self): return getdep(self.__val)
 
 class turn(StatEffect):
-    """ターンごとに加算される値"""
-    def __init__(self, v): self._val = v
+    """ターンごとに加算される値(everyを指定するとeveryターンに一度)"""
+    def __init__(self, v, every=1):
+        self._val = v
+        self._every = every
     @StatAct.actmethod
     def _turn_act(self, obj):
+        if self._every != 1:
+            c = getattr(obj, self._cname, self._every) - 1
+            setattr(obj, self._cname, c or self._every)
+            if c: return
         setattr(obj, self._name,
             getattr(obj, self._name)
           + getval(self._val, obj, type(obj)))
+    def _storage(self):
+        return (self._cname,) if self._every != 1 else ()
     def set_name(self, cls, name):
         self._name = name
+        self._cname = f'_{cls.__name__}__{name}_t'
         self._turn_act.register(cls, name, self)
     @property
     def dependencies(self): return getdep(self._val)
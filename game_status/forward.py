@@ -0,0 +1,222 @@
+# coding: utf-8
+'''
+# ターンの早送り
+- def advance(GameObject, n)
+  - turn()をn回呼んだのと同じ状態へ、一ターンずつ進めずに進める
+- def advance_buff(Buff, 対象, n)
+  - Buff.turn(対象)をn回呼んだのと同じ状態へ進める
+
+turn効果とバフのAddによる一定値の加算、読み出し時のminim, maxim, bonusは、
+どれも`x -> min(hi, max(lo, x + c))`の形の関数で、この形は合成しても変わりません。
+ステータス値ごとに1ターン分の関数を作り、二乗を繰り返してnターン分をO(log n)で求めます。
+バフが終了するターンは、バフ自身のステータス値をkターン進めて終了しているかで二分探索し、
+そこで区切って進めます(一度終了したバフは終了したままとみなします)。
+
+加算値や上下限がターンで変わるステータス値に依存している、
+バフが読み出し時の効果やDisableを持つ、スタックする、
+`_pre_turn`/`_post_turn`をオーバーライドしているなど、この形にならないときは
+バフの並びが変わるまで一ターンずつturn()します。
+浮動小数点数の加算は、一ターンずつ足したときと丸め誤差の分だけ異なることがあります。
+'''
+import math, types
+
+from .bases import GameObject, HasStatus, StatBase, getval, getdep
+from .stats import StatEffect, Value, Point
+from . import effects, buff
+
+_ID = (0, -math.inf, math.inf) # (c, lo, hi): x -> min(hi, max(lo, x + c))
+
+def _then(f, g):
+    """fの後にgを適用する関数"""
+    c1, lo1, hi1 = f
+    c2, lo2, hi2 = g
+    lo1, hi1 = lo1 + c2, hi1 + c2
+    return (c1 + c2, min(max(lo1, lo2), hi2), max(min(hi1, hi2), lo2))
+def _power(f, n:int):
+    """fをn回適用する関数"""
+    res = _ID
+    while n:
+        if n & 1: res = _then(res, f)
+        f = _then(f, f)
+        n >>= 1
+    return res
+def _add(c): return (c, -math.inf, math.inf)
+
+class _NonLinear(Exception):
+    """一ターンずつ進めるしかない"""
+
+def _number(v):
+    if type(v) not in (int, float): raise _NonLinear
+    return v
+
+class _Plan:
+    """一つのオブジェクトの、ステータス値ごとの1ターン分の関数"""
+    def __init__(self, obj):
+        self.obj = obj
+        self.steps = [] # [(name, 裏側の値の属性名, 関数, every, カウンタの属性名), ...]
+    def save(self):
+        obj = self.obj
+        return [(getattr(obj, v), cname and getattr(obj, cname, every))
+                for _, v, _, every, cname in self.steps]
+    def restore(self, state):
+        obj = self.obj
+        for (n, _, _, _, cname), (x, c) in zip(self.steps, state):
+            setattr(obj, n, x)
+            if cname: setattr(obj, cname, c)
+    def apply(self, k:int):
+        """kターン進める"""
+        obj = self.obj
+        for n, v, f, every, cname in self.steps:
+            times = k
+            if cname:
+                s = getattr(obj, cname, every) # 次に加算されるまでのターン数
+                times = 0 if k < s else (k - s) // every + 1
+                setattr(obj, cname, s - k if k < s else every - (k - s) % every)
+            if times:
+                c, lo, hi = _power(f, times)
+                setattr(obj, n, min(hi, max(lo, getattr(obj, v) + c)))
+
+def _const(a, obj, changing):
+    """ターンを進めても変わらない値"""
+    if isinstance(a, StatBase):
+        if getdep(a) & changing: raise _NonLinear
+        a = getval(a, obj, type(obj))
+    return _number(a)
+
+def _read_map(obj, name, changing):
+    """ステータス値を読み出すときに裏側の値へ適用される関数"""
+    stat = getattr(type(obj), name, None)
+    if type(stat) is Point: return _ID # Pointは裏側の値をそのまま返す
+    if type(stat) is not Value: raise _NonLinear
+    f = _ID
+    for o in stat._ops:
+        t = type(o)
+        if t is effects.minim:
+            f = _then(f, (0, _const(o._m, obj, changing), math.inf))
+        elif t is effects.maxim:
+            f = _then(f, (0, -math.inf, _const(o._m, obj, changing)))
+        elif t is effects.bonus:
+            f = _then(f, _add(_const(o._attr, obj, changing)))
+        elif t is effects.buffed:
+            if isinstance(obj, GameObject) and obj._buffs_for(name):
+                raise _NonLinear
+        elif t.get is not StatEffect.get: raise _NonLinear
+    return f
+
+def _changing(cls, names) -> set[str]:
+    """ターンで書き換わるステータス値と、それに依存するステータス値"""
+    res = set()
+    for n in names: res.update(cls._dependents.get(n, (n,)))
+    return res
+
+def _turns(obj) -> dict:
+    """自身のturn効果 {name: [turn, ...]}"""
+    res = {}
+    for act in type(obj)._turn_plan:
+        eff = getattr(act, "__self__", None)
+        if type(act) is not types.MethodType or type(eff) is not effects.turn:
+            raise _NonLinear
+        res.setdefault(eff._name, []).append(eff)
+    return res
+
+def _build(obj, turns:dict, adds:dict) -> _Plan:
+    """turn効果とバフの加算({name: [加算値, ...]})から関数を作る"""
+    cls = type(obj)
+    changing = _changing(cls, [*turns, *adds])
+    plan = _Plan(obj)
+    for n in dict.fromkeys([*turns, *adds]):
+        r = _read_map(obj, n, changing)
+        v = getattr(cls, n)._vname
+        _number(getattr(obj, v, None))
+        effs, incs = turns.get(n, ()), adds.get(n, ())
+        f, every, cname = _ID, 1, None
+        for e in effs:
+            f = _then(_then(f, r), _add(_const(e._val, obj, changing)))
+            if e._every != 1:
+                if len(effs) + len(incs) > 1: raise _NonLinear
+                every, cname = e._every, e._cname
+        for c in incs: f = _then(_then(f, r), _add(c))
+        plan.steps.append((n, v, f, every, cname))
+    return plan
+
+def _buff_plan(b) -> tuple[_Plan, dict]:
+    """(バフ自身の関数, 対象への加算 {name: [加算値, ...]})"""
+    cls = type(b)
+    if b._stacking or cls.turn is not buff.Buff.turn: raise _NonLinear
+    plan = _build(b, _turns(b), {})
+    changing = _changing(cls, [n for n, *_ in plan.steps])
+    adds = {}
+    for act in cls._act_plan:
+        add = getattr(act, "__self__", None)
+        if type(act) is not types.MethodType or type(add) is not buff.Add:
+            raise _NonLinear
+        name, a = add._linear()
+        adds.setdefault(name, []).append(_const(a, b, changing))
+    return plan, adds
+
+def _expires_within(b, plan:_Plan, limit:int) -> int|None:
+    """kターン後に終了している最小のk(limitターン以内に終了しなければNone)"""
+    state = plan.save()
+    def expired(k):
+        plan.apply(k)
+        try: return b._expired()
+        finally: plan.restore(state)
+    if not expired(limit): return None
+    lo, hi = 1, limit
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if expired(mid): hi = mid
+        else: lo = mid + 1
+    return lo
+
+def _segment(obj:GameObject, n:int) -> int:
+    """次にバフが終了するまで(最大nターン)進め、進めたターン数を返す"""
+    cls = type(obj)
+    if (cls._pre_turn is not GameObject._pre_turn or
+            cls._post_turn is not GameObject._post_turn):
+        raise _NonLinear
+    adds, plans = {}, []
+    for b in obj._buffs:
+        bplan, badds = _buff_plan(b)
+        for name, cs in badds.items(): adds.setdefault(name, []).extend(cs)
+        plans.append((b, bplan))
+    plan = _build(obj, _turns(obj), adds)
+    k = n
+    for b, bplan in plans:
+        e = _expires_within(b, bplan, k)
+        if e is not None: k = e
+    plan.apply(k)
+    for _, bplan in plans: bplan.apply(k)
+    buffs = obj._buffs
+    if buffs:
+        expired = [b for b in buffs if b._expired()]
+        if expired: buffs._discard(expired)
+        if obj._memoize or obj._tracked or obj._listeners:
+            obj._buffed_changed(obj._buffed_stats)
+    return k
+
+def _step(obj:GameObject, n:int) -> int:
+    """バフの並びが変わるまで(最大nターン)一ターンずつ進め、進めたターン数を返す"""
+    ids = [id(b) for b in obj._buffs]
+    for i in range(1, n + 1):
+        obj.turn()
+        if [id(b) for b in obj._buffs] != ids: return i
+    return n
+
+
+def advance(obj:GameObject, n:int):
+    """obj.turn()をn回呼んだのと同じ状態へ進める"""
+    while n > 0:
+        try: n -= _segment(obj, n)
+        except _NonLinear: n -= _step(obj, n)
+
+def advance_buff(b:'buff.Buff', stat:HasStatus, n:int):
+    """b.turn(stat)をn回呼んだのと同じ状態へ進める(途中で終了しても止まりません)"""
+    try:
+        bplan, adds = _buff_plan(b)
+        plan = _build(stat, {}, adds)
+    except _NonLinear:
+        for _ in range(n): b.turn(stat)
+        return
+    plan.apply(n)
+    bplan.apply(n)
@@ -0,0 +1,179 @@
+# coding: utf-8
+'''
+# ステータス値の索引
+- class StatIndex
+  - GameObjectの集まりを一つのステータス値(または計算式)の順に並べておき、
+    範囲・上位k件・しきい値の問い合わせに答える
+
+索引は各オブジェクトの`_listen`で書き換えを受け取り、
+索引したステータス値が(`_dependency_graph`を通して)依存しているものが書き換えられた
+オブジェクトだけを覚えておきます。並べ直すのは次に問い合わせたときなので、
+ターン中に何度書き換えられても並べ直しは一度で済みます。
+値はソート済みのバケットの列に持つので、問い合わせは O(log n + 結果の数) です。
+'''
+import itertools, math
+from bisect import bisect_left, insort
+
+from .bases import GameObject, StatBase, getdep
+
+_LOAD = 512 # バケットの大きさの目安
+
+class _SortedKeys:
+    """バケットに分けたソート済みの列"""
+    def __init__(self):
+        self._lists = []
+        self._maxes = [] # 各バケットの最大値
+    def add(self, k):
+        lists, maxes = self._lists, self._maxes
+        if not maxes:
+            lists.append([k]) ; maxes.append(k)
+            return
+        i = bisect_left(maxes, k)
+        if i == len(maxes):
+            i -= 1
+            lists[i].append(k) ; maxes[i] = k
+        else: insort(lists[i], k)
+        lst = lists[i]
+        if len(lst) > 2 * _LOAD:
+            half = lst[_LOAD:]
+            del lst[_LOAD:]
+            lists.insert(i + 1, half) ; maxes.insert(i + 1, half[-1])
+            maxes[i] = lst[-1]
+    def remove(self, k):
+        lists, maxes = self._lists, self._maxes
+        i = bisect_left(maxes, k)
+        lst = lists[i]
+        j = bisect_left(lst, k)
+        del lst[j]
+        if not lst: del lists[i] ; del maxes[i]
+        elif j == len(lst): maxes[i] = lst[-1]
+    def irange(self, lo=None, hi=None):
+        """lo <= k < hi のキーを昇順に"""
+        lists, maxes = self._lists, self._maxes
+        i = 0 if lo is None else bisect_left(maxes, lo)
+        for lst in itertools.islice(lists, i, None):
+            j = 0 if lo is None else bisect_left(lst, lo)
+            lo = None
+            for k in itertools.islice(lst, j, None):
+                if hi is not None and not k < hi: return
+                yield k
+    def irange_reversed(self, lo=None, hi=None):
+        """lo <= k < hi のキーを降順に"""
+        lists, maxes = self._lists, self._maxes
+        i = len(maxes) - 1 if hi is None else min(bisect_left(maxes, hi),
+                                                   len(maxes) - 1)
+        for lst in itertools.islice(reversed(lists), len(lists) - 1 - i, None):
+            j = len(lst) if hi is None else bisect_left(lst, hi)
+            hi = None
+            for x in range(j - 1, -1, -1):
+                k = lst[x]
+                if lo is not None and k < lo: return
+                yield k
+
+
+class StatIndex:
+    """# ステータス値の索引
+    ```python
+    from game_status.index import StatIndex
+
+    by_str = StatIndex("STR", monsters)
+    by_str.top(100) # STRの大きい順に100体
+    dying = StatIndex(Monster.HP / Monster.HP_max, monsters) # 計算式も索引にできる
+    dying.below(0.1) # HPがHP_maxの10%未満
+    by_str.between(10, 20) # 10 <= STR < 20
+    ```
+    値は互いに比較できるものでなければなりません。
+    同じ値のオブジェクトは加えた順に並びます。
+    """
+    def __init__(self, key:str|StatBase, objs=()):
+        self.key = key
+        self._deps = getdep(key) if isinstance(key, StatBase) else {key}
+        self._sorted = _SortedKeys()
+        self._keys = {} # {id(obj): (値, 順番)}
+        self._objs = {} # {順番: obj}
+        self._dirty = {} # 並べ直しを待つ {id(obj): obj}
+        self._triggers = {} # {type: 索引の値が依存しているステータス名}
+        self._seq = itertools.count()
+        for o in objs: self.add(o)
+
+    def __len__(self): return len(self._keys)
+    def __contains__(self, obj): return id(obj) in self._keys
+    def __iter__(self):
+        """値の小さい順"""
+        self._flush()
+        objs = self._objs
+        return (objs[s] for _, s in self._sorted.irange())
+
+    def add(self, obj:GameObject):
+        if obj in self: raise Exception("すでに索引に含まれています。")
+        key = (self._value(obj), next(self._seq))
+        self._sorted.add(key)
+        self._keys[id(obj)] = key
+        self._objs[key[1]] = obj
+        obj._listen(self._changed)
+    def remove(self, obj:GameObject):
+        key = self._keys.pop(id(obj))
+        self._dirty.pop(id(obj), None)
+        self._sorted.remove(key)
+        del self._objs[key[1]]
+        obj._unlisten(self._changed)
+    def clear(self):
+        for obj in list(self._objs.values()): self.remove(obj)
+
+    # 問い合わせ
+    def value(self, obj:GameObject):
+        """索引している値"""
+        self._flush()
+        return self._keys[id(obj)][0]
+    def between(self, lo=None, hi=None) -> list:
+        """lo <= 値 < hi のオブジェクト(値の小さい順)"""
+        return self._select(self._sorted.irange(
+            None if lo is None else (lo,), None if hi is None else (hi,)))
+    def below(self, x, inclusive:bool=False) -> list:
+        """値がx未満(inclusiveならx以下)のオブジェクト(値の小さい順)"""
+        return self._select(self._sorted.irange(
+            None, (x, math.inf) if inclusive else (x,)))
+    def above(self, x, inclusive:bool=False) -> list:
+        """値がxより大きい(inclusiveならx以上)オブジェクト(値の大きい順)"""
+        return self._select(self._sorted.irange_reversed(
+            (x,) if inclusive else (x, math.inf)))
+    def top(self, k:int) -> list:
+        """値の大きい順にk個"""
+        return self._select(itertools.islice(self._sorted.irange_reversed(), k))
+    def bottom(self, k:int) -> list:
+        """値の小さい順にk個"""
+        return self._select(itertools.islice(self._sorted.irange(), k))
+    def _select(self, keys) -> list:
+        self._flush() # keysは取り出すまで読まれないので、ここで並べ直せばよい
+        objs = self._objs
+        return [objs[s] for _, s in keys]
+
+    # 更新
+    def _value(self, obj):
+        key = self.key
+        if isinstance(key, StatBase): return key.__get__(obj, type(obj))
+        return getattr(obj, key)
+    def _trigger_names(self, cls) -> frozenset:
+        """書き換えられると索引の値が変わるステータス名"""
+        res = self._triggers.get(cls)
+        if res is None:
+            deps = self._deps
+            res = self._triggers[cls] = frozenset(
+                n for n, ds in cls._dependents.items()
+                if not deps.isdisjoint(ds))
+        return res
+    def _changed(self, obj, name, deps):
+        if name in self._trigger_names(type(obj)): self._dirty[id(obj)] = obj
+    def _flush(self):
+        """書き換えられたオブジェクトを並べ直す"""
+        dirty = self._dirty
+        if not dirty: return
+        self._dirty = {}
+        keys, sorted_keys = self._keys, self._sorted
+        for i, obj in dirty.items():
+            old = keys[i]
+            new = (self._value(obj), old[1])
+            if new == old: continue
+            sorted_keys.remove(old)
+            sorted_keys.add(new)
+            keys[i] = new
@@ -0,0 +1,176 @@
+# coding: utf-8
+'''
+# プロファイル
+- class Profiler
+  - ステータス値・効果・StatAct・バフごとの呼び出し回数と時間を集計する
+- def profiling(*classes) -> Profiler
+  - withの間だけ計測する
+
+計測中だけ各ディスクリプタの`__get__`、`StatEffect.get`、`StatAct`の処理、
+`Buff.turn`を計測用の関数に差し替えます。計測していないときは元の関数に戻すので、
+通常の実行には何の負担もかかりません。
+計測中はCalcのコンパイルでステータス値を直接読み出さず、ディスクリプタを経由させます。
+'''
+import time
+from contextlib import contextmanager
+
+from .bases import StatAct, HasStatus, _subclasses
+from .stats import StatEffect, Value, Point, Calc, _reset_compiled
+from .compiler import Compiler
+from . import buff
+
+_active = None # 計測中のProfiler
+
+class Profiler:
+    """# 計測結果
+    `records`は`{(種類, 名前): [呼び出し回数, 合計時間, 自身の時間]}`です。
+    種類は`"stat"`(クラス名.ステータス名)、`"effect"`(StatEffectの型名)、
+    `"act"`(StatActの属性名:ステータス名)、`"buff"`(バフのクラス名)のいずれかです。
+    自身の時間は、その中で計測されたほかの呼び出しの時間を除いたものです。
+    ```python
+    from game_status import profile
+    with profile.profiling(Monster) as prof: # 引数なしならすべてのクラス
+        for m in monsters: m.turn()
+    print(prof.report())
+    prof.hot_chains(Monster) # 時間のかかった依存関係の連鎖
+    ```
+    """
+    def __init__(self, classes=()):
+        self.classes = tuple(classes) or None
+        self.records = {}
+        self._stack = []
+        self._patched = []
+
+    def _wants(self, obj) -> bool:
+        return self.classes is None or isinstance(obj, self.classes)
+    def _call(self, key, func, *a, **ka):
+        stack = self._stack
+        stack.append(0.)
+        start = time.perf_counter()
+        try: return func(*a, **ka)
+        finally:
+            t = time.perf_counter() - start
+            child = stack.pop()
+            rec = self.records.get(key)
+            if rec is None: rec = self.records[key] = [0, 0., 0.]
+            rec[0] += 1 ; rec[1] += t ; rec[2] += t - child
+            if stack: stack[-1] += t
+
+    # 差し替え
+    def _patch(self, owner, name, wrapper):
+        self._patched.append((owner, name, vars(owner)[name]))
+        setattr(owner, name, wrapper)
+    def _install(self):
+        for cls in (Value, Point, Calc): self._patch(cls, "__get__",
+                                                     self._wrap_get(cls.__get__))
+        for cls in _subclasses(StatEffect):
+            if "get" in vars(cls): self._patch(cls, "get",
+                                               self._wrap_effect(vars(cls)["get"]))
+        self._patch(StatAct, "__get__", self._wrap_statact(StatAct.__get__))
+        self._patch(StatAct, "bind", self._wrap_bind(StatAct.bind))
+        self._patch(buff.Buff, "turn", self._wrap_buff(buff.Buff.turn))
+        Compiler.inline = False
+        _rebuild()
+    def _uninstall(self):
+        for owner, name, orig in reversed(self._patched):
+            setattr(owner, name, orig)
+        self._patched.clear()
+        Compiler.inline = True
+        _rebuild()
+
+    def _wrap_get(self, orig):
+        def __get__(stat, obj, cls=None):
+            if obj is None or not stat._has_name or not self._wants(obj):
+                return orig(stat, obj, cls)
+            key = ("stat", f"{type(obj).__qualname__}.{stat._name}")
+            return self._call(key, orig, stat, obj, cls)
+        return __get__
+    def _wrap_effect(self, orig):
+        def get(effect, val, obj, cls):
+            if not self._wants(obj): return orig(effect, val, obj, cls)
+            return self._call(("effect", type(effect).__name__),
+                              orig, effect, val, obj, cls)
+        return get
+    def _wrap_statact(self, orig):
+        def __get__(statact, obj, cls=None):
+            call = orig(statact, obj, cls)
+            if obj is None or not self._wants(obj): return call
+            def timed(name, *a, **ka):
+                return self._call(("act", f"{statact._attr}:{name}"),
+                                  call, name, *a, **ka)
+            return timed
+        return __get__
+    def _wrap_bind(self, orig):
+        def bind(statact, name):
+            act = orig(statact, name)
+            key = ("act", f"{statact._attr}:{name}")
+            def timed(obj, *a, **ka):
+                if not self._wants(obj): return act(obj, *a, **ka)
+                return self._call(key, act, obj, *a, **ka)
+            return timed
+        return bind
+    def _wrap_buff(self, orig):
+        def turn(b, stat):
+            if not (self._wants(b) or self._wants(stat)): return orig(b, stat)
+            return self._call(("buff", type(b).__qualname__), orig, b, stat)
+        return turn
+
+    # 結果
+    def top(self, kind:str|None=None, n:int=20):
+        """自身の時間が長い順に[((種類, 名前), [回数, 合計, 自身]), ...]"""
+        items = [(k, v) for k, v in self.records.items()
+                 if kind is None or k[0] == kind]
+        items.sort(key=lambda kv: kv[1][2], reverse=True)
+        return items[:n]
+    def hot_chains(self, cls:type[HasStatus], n:int=5):
+        """依存関係を辿って自身の時間が最も長くなる連鎖 [(秒, [name, 依存先, ...]), ...]"""
+        own = {}
+        for (kind, key), (_, _, t) in self.records.items():
+            c, _, name = key.rpartition(".")
+            if kind == "stat" and c == cls.__qualname__: own[name] = t
+        best = {} # {name: (連鎖の時間, 次の依存先)}
+        graph = cls._dependency_graph
+        for name in cls._init_order:
+            prev = max(((best[d][0], d) for d in graph.get(name, ())
+                        if d in best), default=(0., None))
+            best[name] = (own.get(name, 0.) + prev[0], prev[1])
+        res = []
+        for name in sorted(best, key=lambda k: best[k][0], reverse=True)[:n]:
+            chain, k = [], name
+            while k is not None: chain.append(k) ; k = best[k][1]
+            res.append((best[name][0], chain))
+        return res
+    def report(self, n:int=20) -> str:
+        """自身の時間が長い順の表"""
+        lines = [f'{"kind":<7}{"name":<40}{"calls":>10}'
+                 f'{"total ms":>11}{"self ms":>11}{"us/call":>10}']
+        for (kind, key), (count, total, own) in self.top(n=n):
+            lines.append(f'{kind:<7}{key:<40}{count:>10}{total*1e3:>11.3f}'
+                         f'{own*1e3:>11.3f}{total/count*1e6:>10.3f}')
+        return "\n".join(lines)
+
+
+def enable(*classes) -> Profiler:
+    """計測を始める(classesを指定すればそのインスタンスだけ記録する)"""
+    global _active
+    if _active is not None: raise Exception("すでに計測中です。")
+    _active = Profiler(classes)
+    _active._install()
+    return _active
+def disable() -> Profiler|None:
+    """計測を終えて、差し替えた関数を元に戻す"""
+    global _active
+    prof, _active = _active, None
+    if prof is not None: prof._uninstall()
+    return prof
+@contextmanager
+def profiling(*classes):
+    """withの間だけ計測する"""
+    prof = enable(*classes)
+    try: yield prof
+    finally: disable()
+
+def _rebuild():
+    """コンパイル済みのCalcと、StatActを束縛した手順を作り直す"""
+    _reset_compiled()
+    for cls in _subclasses(HasStatus): cls._build_plans()
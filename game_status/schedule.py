@@ -0,0 +1,117 @@
+# coding: utf-8
+'''
+# ターンの予定
+- class Scheduler
+  - 優先度付きキューで、ターンの来たオブジェクトだけのturn()を呼び出す
+
+各オブジェクトは`turn_period`(クラス属性、またはインスタンスごとに上書き)の間隔で起こされます。
+`turn_period = None`のオブジェクトは、`wake()`されるか`wake_on`に指定した
+ステータス値(またはその依存先)が書き換えられるまで眠り続けます。
+一回のstep()の時間は、全体の数ではなくそのティックに起きるオブジェクトの数に比例します。
+'''
+import heapq, itertools
+
+from .bases import GameObject
+
+class Scheduler:
+    """# ターンの予定
+    ```python
+    from game_status.schedule import Scheduler
+
+    class Apple(GameObject):
+        turn_period = 60 # 60ティックに一度
+        freshness = Value(arg(100), turn(-1))
+    class Player(GameObject):
+        HP = Point(arg(100), maxim(100), turn(1)) # 毎ティック
+    class NPC(GameObject):
+        turn_period = None # 起こされるまで眠る
+        HP = Point(arg(100), maxim(100), turn(1))
+
+    sched = Scheduler()
+    sched.add(Apple()) ; sched.add(player := Player())
+    sched.add(npc := NPC(), wake_on=("HP",)) # HPが変わったら起きる
+    sched.run(120) # Appleは2回、Playerは120回turn()される
+    npc.HP -= 10   # 次のティックで一度だけturn()される
+    ```
+    同じティックに起きるオブジェクトは、予定された順(同じなら登録順)にturn()されます。
+    """
+    def __init__(self, tick:int=0):
+        self.tick = tick
+        self._heap = [] # [[予定のティック, 順番, オブジェクト], ...]
+        self._entries = {} # {id(obj): 予定}
+        self._periods = {} # {id(obj): 間隔(Noneならturn_period)}
+        self._wakers = {} # {id(obj): _listenに登録した関数}
+        self._seq = itertools.count()
+        self._current = None # turn()中のオブジェクト(自身の変化では起こさない)
+
+    def __len__(self): return len(self._periods)
+    def __contains__(self, obj): return id(obj) in self._periods
+    def active(self) -> int:
+        """予定が入っているオブジェクトの数"""
+        return len(self._entries)
+
+    def add(self, obj:GameObject, period=..., delay:int|None=None,
+            wake_on=()):
+        """オブジェクトを登録する
+        periodを省略するとobj.turn_periodを使います。
+        delayを指定すると最初のturn()をそのティック数後にします(既定は一周期後)。
+        wake_onのステータス値は、依存先が書き換えられて連動したときにも起こします。"""
+        if obj in self: raise Exception("すでに登録されています。")
+        for n in wake_on:
+            if n not in obj._dependency_graph:
+                raise Exception(f"起こすきっかけのステータス値{n}がありません。")
+        self._periods[id(obj)] = None if period is ... else (period,)
+        if wake_on:
+            names = frozenset(wake_on)
+            def waker(o, name, deps): # depsは書き換えられたものと連動するステータス名
+                if o is not self._current and not names.isdisjoint(deps): self.wake(o, 1)
+            obj._listen(waker)
+            self._wakers[id(obj)] = waker
+        if delay is None: delay = self._period(obj)
+        if delay is not None: self._schedule(obj, self.tick + delay)
+    def remove(self, obj:GameObject):
+        self.sleep(obj)
+        del self._periods[id(obj)]
+        waker = self._wakers.pop(id(obj), None)
+        if waker is not None: obj._unlisten(waker)
+    def wake(self, obj:GameObject, delay:int=1):
+        """delayティック後(既定は次のティック)にturn()させる
+        すでにそれより早い予定があれば何もしません。"""
+        due = self.tick + max(delay, 1)
+        entry = self._entries.get(id(obj))
+        if entry is not None:
+            if entry[0] <= due: return
+            entry[2] = None # 古い予定は取り出したときに捨てる
+        self._schedule(obj, due)
+    def sleep(self, obj:GameObject):
+        """予定を取り消す(wakeされるまでturn()されない)"""
+        entry = self._entries.pop(id(obj), None)
+        if entry is not None: entry[2] = None
+
+    def step(self) -> int:
+        """1ティック進め、turn()したオブジェクトの数を返す"""
+        self.tick += 1
+        heap, tick, count = self._heap, self.tick, 0
+        while heap and heap[0][0] <= tick:
+            _, _, obj = heapq.heappop(heap)
+            if obj is None: continue
+            del self._entries[id(obj)]
+            self._current = obj
+            try: obj.turn()
+            finally: self._current = None
+            count += 1
+            if id(obj) in self._entries: continue # turn()の中でwakeされた
+            period = self._period(obj)
+            if period is not None: self._schedule(obj, tick + period)
+        return count
+    def run(self, ticks:int) -> int:
+        """ticksティック進め、turn()の合計回数を返す"""
+        return sum(self.step() for _ in range(ticks))
+
+    def _period(self, obj):
+        p = self._periods.get(id(obj))
+        return obj.turn_period if p is None else p[0]
+    def _schedule(self, obj, due):
+        entry = [due, next(self._seq), obj]
+        self._entries[id(obj)] = entry
+        heapq.heappush(self._heap, entry)
@@ -0,0 +1,253 @@
+# coding: utf-8
+'''
+# データファイルからのクラス定義
+- def load_schema(path | dict, cache_dir=None) -> dict[str, type]
+  - JSONやTOMLに書いたステータス定義からGameObjectやBuffのサブクラスを作る
+
+```toml
+[classes.Monster]
+base = "GameObject"
+memoize = true
+[classes.Monster.stats]
+STR = {Value = [["arg", 1], ["minim", 0], ["grow", 0.1], "buffed"]}
+HP_max = "(STR + 1) * 10"  # 文字列は計算式(Calc)
+HP = {Point = [["arg", "HP_max"], ["minim", 0], ["maxim", "HP_max"], ["turn", 1]]}
+name = "'スライム' + '（瀕死）' * (HP < HP_max / 10)"
+
+[classes.Poison]
+base = "Buff"
+[classes.Poison.stats]
+effect = {Value = [["arg", 1]]}
+duration = {Point = [["arg", 10], ["turn", -1]]}
+HP = {Add = "-effect"}
+```
+```python
+from game_status.schema import load_schema
+classes = load_schema("monsters.toml", cache_dir=".cache")
+slime = classes["Monster"](STR=3)
+```
+計算式では四則演算などの演算子、比較、`not`/`and`/`or`(ビット演算として扱う)、
+`min`, `max`, `abs`, `round`, `int`, `float`, `str`, `len`が使えます。
+効果の引数に書いた文字列も計算式です。
+
+`cache_dir`を指定すると、解析した計算式と依存関係を解決した初期化順を
+スキーマのハッシュごとにJSONでキャッシュします。次回からは計算式の解析と循環の検査、
+初期化順の整列を行わずにクラスを組み立てます(キャッシュを読み込んでもコードは実行されません)。
+'''
+import ast, hashlib, json, operator as op, os, tomllib
+
+from .bases import HasStatus, GameObject, StatBase
+from .stats import Value, Point, Calc
+from . import effects, buff
+
+_CACHE_VERSION = 2
+
+class SchemaError(Exception):
+    """スキーマの誤り"""
+
+_BASES = {"HasStatus": HasStatus, "GameObject": GameObject, "Buff": buff.Buff}
+_EFFECTS = {n: getattr(effects, n) for n in (
+    "arg", "default", "minim", "maxim", "bonus", "turn", "grow", "buffed")}
+_STATS = {"Value": Value, "Point": Point}
+_BUFF_STATS = {"Add": buff.Add, "Disable": buff.Disable}
+_OPTIONS = ("memoize", "compact", "track", "stacking")
+_FUNCS = {f.__name__: f for f in (min, max, abs, round, int, float, str, len)}
+
+# 計算式
+_AST_OPS = {
+    ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "truediv",
+    ast.FloorDiv: "floordiv", ast.Mod: "mod", ast.Pow: "pow",
+    ast.BitAnd: "and_", ast.BitOr: "or_", ast.BitXor: "xor",
+    ast.USub: "neg", ast.UAdd: "pos", ast.Invert: "invert", ast.Not: "not_",
+    ast.Lt: "lt", ast.LtE: "le", ast.Gt: "gt", ast.GtE: "ge",
+    ast.Eq: "eq", ast.NotEq: "ne", ast.And: "and_", ast.Or: "or_"}
+
+def _parse(src:str):
+    """計算式を木(タプル)にする
+    ('c', 定数) | ('n', 名前) | ('op', 演算子名, 引数...) | ('f', 関数名, 引数...)"""
+    try: tree = ast.parse(src, mode="eval").body
+    except SyntaxError as e: raise SchemaError(f"計算式の構文エラー: {src!r}") from e
+    def conv(n):
+        if isinstance(n, ast.Constant): return ("c", n.value)
+        if isinstance(n, ast.Name): return ("n", n.id)
+        if isinstance(n, ast.BinOp) and type(n.op) in _AST_OPS:
+            return ("op", _AST_OPS[type(n.op)], conv(n.left), conv(n.right))
+        if isinstance(n, ast.UnaryOp) and type(n.op) in _AST_OPS:
+            return ("op", _AST_OPS[type(n.op)], conv(n.operand))
+        if isinstance(n, ast.BoolOp):
+            res = conv(n.values[0])
+            for v in n.values[1:]: res = ("op", _AST_OPS[type(n.op)], res, conv(v))
+            return res
+        if isinstance(n, ast.Compare) and all(type(o) in _AST_OPS for o in n.ops):
+            items = [conv(n.left)] + [conv(c) for c in n.comparators]
+            res = None
+            for o, a, b in zip(n.ops, items, items[1:]):
+                cmp = ("op", _AST_OPS[type(o)], a, b)
+                res = cmp if res is None else ("op", "and_", res, cmp)
+            return res
+        if (isinstance(n, ast.Call) and isinstance(n.func, ast.Name)
+                and n.func.id in _FUNCS and not n.keywords):
+            return ("f", n.func.id, *(conv(a) for a in n.args))
+        raise SchemaError(f"計算式で使えない書き方です: {ast.unparse(n)!r}")
+    return conv(tree)
+
+def _names(t) -> set[str]:
+    if t[0] == "n": return {t[1]}
+    if t[0] == "c": return set()
+    res = set()
+    for a in t[2:]: res |= _names(a)
+    return res
+
+def _build(t, env):
+    """木からCalcを組み立てる(ステータスを含まない部分は計算してしまう)"""
+    kind = t[0]
+    if kind == "c": return t[1]
+    if kind == "n":
+        if t[1] not in env: raise SchemaError(f"ステータス値{t[1]}がありません。")
+        return env[t[1]]
+    func = getattr(op, t[1]) if kind == "op" else _FUNCS[t[1]]
+    args = [_build(a, env) for a in t[2:]]
+    if not any(isinstance(a, StatBase) for a in args): return func(*args)
+    return Calc(func, *args)
+
+
+# スキーマの変換
+def _arg(a):
+    """効果の引数(文字列は計算式)"""
+    return _parse(a) if isinstance(a, str) else ("c", a)
+
+def _stat_spec(cname, name, spec):
+    """ステータス値の定義を(種類, 引数の一覧)にする"""
+    if isinstance(spec, str): return ("Calc", [_parse(spec)])
+    if not (isinstance(spec, dict) and len(spec) == 1):
+        raise SchemaError(f"{cname}.{name}: ステータス値の定義が不正です。")
+    (kind, body), = spec.items()
+    if kind in _BUFF_STATS: return (kind, [_arg(body)])
+    if kind not in _STATS:
+        raise SchemaError(f"{cname}.{name}: 不明な種類{kind}です。")
+    ops = []
+    for e in body:
+        if isinstance(e, str): e = [e]
+        if e[0] not in _EFFECTS:
+            raise SchemaError(f"{cname}.{name}: 不明な効果{e[0]}です。")
+        ops.append((e[0], [_arg(a) for a in e[1:]]))
+    return (kind, ops)
+
+def _spec_names(spec) -> set[str]:
+    kind, body = spec
+    res = set()
+    if kind in _STATS:
+        for _, args in body:
+            for a in args: res |= _names(a)
+    else:
+        for a in body: res |= _names(a)
+    return res
+
+def _compile(schema:dict) -> list:
+    """スキーマを検査し、クラスを組み立てる順の定義にする
+    [(クラス名, 基底クラス名, オプション, 組み立て順の[(name, spec), ...], 宣言順の名前), ...]"""
+    classes = schema.get("classes", schema)
+    res, done = [], set()
+    def visit(cname, path=()):
+        if cname in done: return
+        if cname in path: raise SchemaError(f"{cname}: 継承が循環しています。")
+        c = classes[cname]
+        base = c.get("base", "GameObject")
+        if base in classes: visit(base, path + (cname,))
+        elif base not in _BASES:
+            raise SchemaError(f"{cname}: 不明な基底クラス{base}です。")
+        specs = {n: _stat_spec(cname, n, s)
+                 for n, s in c.get("stats", {}).items()}
+        # 参照される同じクラスのステータス値を先に作る
+        order, state = [], {}
+        def dep(n):
+            if state.get(n) == 2: return
+            if state.get(n) == 1:
+                raise SchemaError(f"{cname}.{n}: 依存関係の循環を検知しました。")
+            state[n] = 1
+            for d in _spec_names(specs[n]):
+                if d in specs: dep(d)
+            state[n] = 2
+            order.append(n)
+        for n in specs: dep(n)
+        options = {k: c[k] for k in _OPTIONS if k in c}
+        res.append((cname, base, options,
+                    [(n, specs[n]) for n in order], list(specs)))
+        done.add(cname)
+    for cname in classes: visit(cname)
+    return res
+
+def _alias(v): return v
+def _stat(kind, body, env):
+    if kind == "Calc":
+        res = _build(body[0], env)
+        # 別名はディスクリプタを共有できないので計算値にする
+        if body[0][0] == "n": res = Calc(_alias, res)
+        return res
+    if kind in _BUFF_STATS: return _BUFF_STATS[kind](_build(body[0], env))
+    return _STATS[kind](*(_EFFECTS[e](*(_build(a, env) for a in args))
+                          for e, args in body))
+
+def _make(compiled, module, orders=None) -> dict[str, type]:
+    """組み立て順の定義からクラスを作る(ordersがあれば初期化順の整列を省く)"""
+    res = {}
+    for cname, base, options, specs, declared in compiled:
+        base_cls = res.get(base) or _BASES[base]
+        env = _Env(base_cls)
+        for n, (kind, body) in specs:
+            env[n] = _stat(kind, body, env)
+        ns = {n: env[n] for n in declared}
+        ns["__module__"] = module
+        ns["__qualname__"] = cname
+        ka = dict(options)
+        if orders is not None: ka["order"] = orders[cname]
+        try: res[cname] = type(cname, (base_cls,), ns, **ka)
+        except SchemaError: raise
+        except Exception as e: raise SchemaError(f"{cname}: {e}") from e
+    return res
+
+class _Env(dict):
+    """計算式の名前: 同じクラスになければ基底クラスのステータス値"""
+    def __init__(self, base): self._base = base
+    def __contains__(self, n):
+        return (dict.__contains__(self, n) or
+                isinstance(_inherited(self._base, n), StatBase))
+    def __missing__(self, n): return _inherited(self._base, n)
+
+def _inherited(cls, n):
+    for c in cls.__mro__:
+        if n in vars(c): return vars(c)[n]
+
+
+# 読み込み
+def _raw(source) -> bytes:
+    if isinstance(source, dict):
+        return json.dumps(source, sort_keys=True).encode()
+    with open(source, "rb") as f: return f.read()
+def _decode(source, raw:bytes) -> dict:
+    if isinstance(source, dict): return source
+    if str(source).endswith(".toml"): return tomllib.loads(raw.decode())
+    return json.loads(raw)
+
+def load_schema(source, cache_dir=None,
+                module:str="game_status.schema") -> dict[str, type]:
+    """スキーマ(ファイルのパスか辞書)からクラスを作り、{クラス名: クラス}を返す"""
+    raw = _raw(source)
+    if cache_dir is not None:
+        key = hashlib.sha256(
+            f"{_CACHE_VERSION}:{module}:".encode() + raw).hexdigest()
+        path = os.path.join(cache_dir, f"{key}.schema.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f: compiled, orders = json.load(f)
+            return _make(compiled, module, orders)
+    compiled = _compile(_decode(source, raw))
+    res = _make(compiled, module)
+    if cache_dir is not None:
+        orders = {n: cls._init_order for n, cls in res.items()}
+        try: data = json.dumps([compiled, orders], ensure_ascii=False)
+        except TypeError: return res # JSONにできない定数(複素数など)を含むときはキャッシュしない
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f: f.write(data)
+        os.replace(tmp, path)
+    return res
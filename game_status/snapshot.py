@@ -0,0 +1,254 @@
+# coding: utf-8
+'''
+# バイナリのスナップショット
+- def dumps(HasStatus) -> bytes / def loads(bytes) -> HasStatus
+  - 一つのオブジェクトを保存・復元する
+- def save(path, [HasStatus, ...]) / def load(path) -> SnapshotFile
+  - 多数のオブジェクトをファイルに保存し、mmapで必要な分だけ復元する
+- def encode_changes(type[HasStatus], dict) -> bytes / def decode_changes(type[HasStatus], bytes) -> dict
+  - 変更されたステータス値(HasStatus.changes)を送信用に詰める
+
+クラスごとの裏側の値の配置(`HasStatus._layout`)に従って、
+一つのオブジェクトを固定長の部分と可変長の部分からなるレコードに詰めます。
+復元ではargやdefaultの初期化を実行せず、保存した値をそのまま書き戻します。
+メンバー(`aggregate.Members`)を持つクラスは保存できません(pickleを使ってください)。
+
+## ファイル形式
+```
+b"GSSNAP\\0\\1"
+u4 ヘッダの長さ, ヘッダ(JSON: {"classes": [["モジュール:クラス名", [属性名, ...]], ...], "count": n})
+u8 × (n+1) 各レコードの開始位置(レコード領域の先頭から)
+レコード:
+  u4 クラス番号, u4 バフの数
+  u1 × 属性数 値の種類
+  8バイト × 属性数 値(整数, 浮動小数点数, または可変長部分の長さ)
+  可変長部分(文字列やpickleした値)
+  バフのレコード × バフの数
+```
+'''
+import importlib, json, mmap, pickle, struct
+
+from .bases import HasStatus
+from .aggregate import Members
+
+_MAGIC = b"GSSNAP\0\1"
+_MISSING = object()
+
+# 値の種類
+_T_MISSING, _T_NONE, _T_FALSE, _T_TRUE, _T_INT, _T_FLOAT, _T_STR, _T_OBJ = range(8)
+_FMT = "qqqqqdQQ"
+_CONST = {_T_NONE: None, _T_FALSE: False, _T_TRUE: True}
+_HEAD = struct.Struct("<II")
+_U4 = struct.Struct("<I")
+_U8 = struct.Struct("<Q")
+_INT_MIN, _INT_MAX = -2**63, 2**63 - 1
+
+_structs = {} # {値の種類の並び: struct.Struct}
+def _payload(tags:bytes) -> struct.Struct:
+    res = _structs.get(tags)
+    if res is None:
+        res = _structs[tags] = struct.Struct(
+            "<" + "".join(_FMT[t] for t in tags))
+    return res
+
+def _pack(values):
+    """値を(種類の並び, 8バイトの値の一覧, 可変長部分の一覧)にする"""
+    tags = bytearray()
+    payload, extra = [], []
+    for v in values:
+        t = type(v)
+        if v is _MISSING: tags.append(_T_MISSING) ; payload.append(0)
+        elif v is None: tags.append(_T_NONE) ; payload.append(0)
+        elif t is bool:
+            tags.append(_T_TRUE if v else _T_FALSE) ; payload.append(0)
+        elif t is int and _INT_MIN <= v <= _INT_MAX:
+            tags.append(_T_INT) ; payload.append(v)
+        elif t is float: tags.append(_T_FLOAT) ; payload.append(v)
+        else:
+            if t is str:
+                tags.append(_T_STR)
+                data = v.encode("utf-8", "surrogatepass")
+            else:
+                tags.append(_T_OBJ)
+                data = pickle.dumps(v, pickle.HIGHEST_PROTOCOL)
+            payload.append(len(data)) ; extra.append(data)
+    return bytes(tags), payload, extra
+def _unpack(buf, off:int, n:int):
+    """_packしたn個の値をbufのoffから読み出し、(値の一覧, 次の位置)を返す"""
+    tags = bytes(buf[off:off + n])
+    off += n
+    payload = _payload(tags)
+    values = list(payload.unpack_from(buf, off))
+    off += payload.size
+    for i, t in enumerate(tags):
+        if t == _T_INT or t == _T_FLOAT: continue
+        if t in _CONST: values[i] = _CONST[t]
+        elif t == _T_MISSING: values[i] = _MISSING
+        else:
+            size = values[i]
+            data = buf[off:off + size]
+            off += size
+            if t == _T_STR: values[i] = str(data, "utf-8", "surrogatepass")
+            else: values[i] = pickle.loads(data)
+    return values, off
+
+def _attrs(cls:type) -> tuple[str, ...]:
+    return tuple(cls._layout) + tuple(
+        a for a in cls._state_attrs if a not in cls._layout)
+
+
+class _Writer:
+    """レコードを書き出す間のクラス表を保持する"""
+    def __init__(self):
+        self._classes = {} # {type: (番号, 属性名)}
+        self.header = []
+    def _schema(self, cls):
+        res = self._classes.get(cls)
+        if res is None:
+            if any(isinstance(v, Members) for c in cls.__mro__ for v in vars(c).values()):
+                raise TypeError(f"{cls.__qualname__}はメンバーを持つので保存できません。")
+            attrs = _attrs(cls)
+            res = self._classes[cls] = (len(self.header), attrs)
+            self.header.append(
+                [f"{cls.__module__}:{cls.__qualname__}", list(attrs)])
+        return res
+    def record(self, obj, out:list):
+        """objのレコードをoutに追加する"""
+        idx, attrs = self._schema(type(obj))
+        buffs = getattr(obj, "_buffs", ())
+        tags, payload, extra = _pack(getattr(obj, a, _MISSING) for a in attrs)
+        out.append(_HEAD.pack(idx, len(buffs)))
+        out.append(tags)
+        out.append(_payload(tags).pack(*payload))
+        out.extend(extra)
+        for b in buffs: self.record(b, out)
+
+
+class _Reader:
+    """クラス表に従ってレコードを復元する"""
+    def __init__(self, header, classes=()):
+        known = {f"{c.__module__}:{c.__qualname__}": c for c in classes}
+        self._classes = []
+        for name, attrs in header:
+            cls = known.get(name) or _resolve(name)
+            # 保存後に削除された属性は読み飛ばす
+            keep = tuple(a if a in cls._layout or a in cls._state_attrs
+                         else None for a in attrs)
+            self._classes.append((cls, keep, len(attrs)))
+    def record(self, buf, off:int):
+        """bufのoffからレコードを一つ復元し、(オブジェクト, 次の位置)を返す"""
+        idx, nbuffs = _HEAD.unpack_from(buf, off)
+        cls, attrs, n = self._classes[idx]
+        off += _HEAD.size
+        values, off = _unpack(buf, off, n)
+        obj = cls._blank()
+        for a, v in zip(attrs, values):
+            if a is not None and v is not _MISSING: setattr(obj, a, v)
+        if nbuffs:
+            buffs = []
+            for _ in range(nbuffs):
+                b, off = self.record(buf, off)
+                buffs.append(b)
+            list.extend(obj._buffs, buffs) # 重ね直さずにそのまま戻す
+        return obj, off
+
+def _resolve(name:str) -> type:
+    module, _, qualname = name.partition(":")
+    res = importlib.import_module(module)
+    for n in qualname.split("."): res = getattr(res, n)
+    if not (isinstance(res, type) and issubclass(res, HasStatus)):
+        raise TypeError(f"{name}はHasStatusのサブクラスではありません。")
+    return res
+
+
+def _encode(objs) -> list[bytes]:
+    writer = _Writer()
+    records, offsets, pos = [], [], 0
+    for obj in objs:
+        offsets.append(pos)
+        start = len(records)
+        writer.record(obj, records)
+        pos += sum(len(r) for r in records[start:])
+    offsets.append(pos)
+    header = json.dumps(
+        {"classes": writer.header, "count": len(offsets) - 1},
+        ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return [_MAGIC, _U4.pack(len(header)), header,
+            struct.pack(f"<{len(offsets)}Q", *offsets), *records]
+
+def dumps(obj:HasStatus) -> bytes:
+    """一つのオブジェクト(バフを含む)をバイト列にする"""
+    return b"".join(_encode((obj,)))
+def loads(data:bytes, classes=()) -> HasStatus:
+    """dumpsしたバイト列から復元する"""
+    return SnapshotFile(data, classes)[0]
+def save(path, objs):
+    """多数のオブジェクトを一つのファイルに保存する"""
+    with open(path, "wb") as f: f.writelines(_encode(objs))
+def load(path, classes=()) -> 'SnapshotFile':
+    """保存したファイルをmmapで開く(レコードは読み出したときに復元されます)"""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return SnapshotFile(mm, classes)
+
+
+class SnapshotFile:
+    """# スナップショットのファイル
+    レコードの位置の表だけを読み、各オブジェクトは`file[i]`で必要になったときに復元します。
+    ```python
+    from game_status import snapshot
+    snapshot.save("world.snap", monsters)
+    with snapshot.load("world.snap") as snap:
+        m = snap[1234] # この一体だけ復元される
+        everyone = list(snap)
+    ```
+    モジュールから読み込めないクラス(関数内で定義したものなど)は`classes`で渡してください。
+    """
+    def __init__(self, data, classes=()):
+        if bytes(data[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError("スナップショットの形式ではありません。")
+        self._data = data
+        pos = len(_MAGIC)
+        (size,) = _U4.unpack_from(data, pos)
+        pos += _U4.size
+        header = json.loads(bytes(data[pos:pos + size]))
+        pos += size
+        self._count = header["count"]
+        self._offsets = pos
+        self._records = pos + _U8.size * (self._count + 1)
+        self._reader = _Reader(header["classes"], classes)
+    def __len__(self): return self._count
+    def __getitem__(self, i:int) -> HasStatus:
+        if not -self._count <= i < self._count: raise IndexError(i)
+        i %= self._count
+        (off,) = _U8.unpack_from(self._data, self._offsets + _U8.size * i)
+        return self._reader.record(self._data, self._records + off)[0]
+    def __iter__(self):
+        data, off = self._data, self._records
+        for _ in range(self._count):
+            obj, off = self._reader.record(data, off)
+            yield obj
+    def close(self):
+        if isinstance(self._data, mmap.mmap): self._data.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+
+# 変更の送信
+_COUNT = struct.Struct("<H")
+def encode_changes(cls:type[HasStatus], changes:dict) -> bytes:
+    """HasStatus.changes()の結果を送信用のバイト列にする
+    ステータス名はクラスの追跡対象の番号(u2)になります。"""
+    index = cls._track_index
+    tags, payload, extra = _pack(changes.values())
+    return b"".join((
+        struct.pack(f"<H{len(changes)}H", len(changes),
+                    *(index[n] for n in changes)),
+        tags, _payload(tags).pack(*payload), *extra))
+def decode_changes(cls:type[HasStatus], data:bytes) -> dict:
+    """encode_changesしたバイト列から{ステータス名: 値}に戻す"""
+    (n,) = _COUNT.unpack_from(data, 0)
+    idx = struct.unpack_from(f"<{n}H", data, _COUNT.size)
+    values, _ = _unpack(data, _COUNT.size * (n + 1), n)
+    tracked = cls._tracked
+    return {tracked[i]: v for i, v in zip(idx, values)}
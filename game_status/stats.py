@@ -3,7 +3,7 @@
 from .bases import StatBase, STATS, SVAL, getval, StatAct, getdep
 import operator as op
 from mathobj import rjoins, MathObj
-import typing
+import typing, weakref
 
 class Stat(StatBase[STATS, SVAL], MathObj):
     """# ステータス値のディスクリプタ
@@ -49,9 +49,15 @@ class StatEffect(typing.Generic[STATS, SVAL]):
     def set_name(self, cls:type[STATS], name:str):
         """Attrディスクリプタの__set_name__が呼び出されたときに呼ばれる"""
         self.__name = name
+    def _storage(self) -> tuple[str, ...]:
+        """インスタンスに保存する裏側の値の属性名"""
+        return ()
     def get(self, val:SVAL, obj:STATS, cls:type[STATS]) -> SVAL:
         """Attrディスクリプタの__get__が呼び出されたときに呼ばれる"""
         return val
+    def _inline(self, ctx, val:str) -> str|None:
+        """Calcのコンパイル時に呼ばれる。getと同じ値になる式を返す(Noneならgetを呼び出す)"""
+        if type(self).get is StatEffect.get: return val
     @property
     def dependencies(self) -> set[str]:
         return set()
@@ -71,11 +77,16 @@ class Value(Stat):
     @StatAct.actmethod
     def _set_true_value(self, obj, value):
         setattr(obj, self._vname, value)
+        obj._stat_changed(self._name)
     @property
     def _dependencies(self):
         res = set()
         for o in self._ops: res |= o.dependencies
         return res
+    def _storage(self):
+        res = (self._vname,)
+        for o in self._ops: res += o._storage()
+        return res
     def __set_name__(self, cls, name):
         self._vname = f'_{cls.__name__}__{name}_v'
         for o in self._ops: o.set_name(cls, name)
@@ -83,6 +94,17 @@ class Value(Stat):
         super().__set_name__(cls, name)
     def __get__(self, obj, cls=None):
         if obj is None: return self
+        if obj._memoize:
+            memo = obj._memo
+            name = self._name
+            if name in memo: return memo[name]
+            res = memo[name] = self._eval(obj, cls)
+            return res
+        return self._eval(obj, cls)
+    def __set__(self, obj, value):
+        setattr(obj, self._vname, value)
+        obj._stat_changed(self._name)
+    def _eval(self, obj, cls):
         res = None
         if hasattr(obj, self._vname):
             res = getattr(obj, self._vname)
@@ -99,11 +121,16 @@ class Point(Stat):
     @StatAct.actmethod
     def _set_true_value(self, obj, value):
         setattr(obj, self._vname, value)
+        obj._stat_changed(self._name)
     @property
     def _dependencies(self):
         res = set()
         for o in self._ops: res |= o.dependencies
         return res
+    def _storage(self):
+        res = (self._vname,)
+        for o in self._ops: res += o._storage()
+        return res
     def __set_name__(self, cls, name):
         self._vname = f'_{cls.__name__}__{name}_v'
         for o in self._ops: o.set_name(cls, name)
@@ -112,12 +139,17 @@ class Point(Stat):
     def __get__(self, obj, cls=None):
         if obj is None: return self
         return getattr(obj, self._vname)
+    def __set__(self, obj, value):
+        setattr(obj, self._vname, value)
+        obj._stat_changed(self._name)
 
 class Calc(Stat):
-    """計算値"""
+    """計算値
+    初めて読み出されたときに木構造を一つの関数へコンパイルします(compiler.py)。"""
     def __init__(self, f, *a, **ka):
         self.func = f ; self.args = a
         self.kwargs = ka
+        self._compiled = None
     @property
     def _dependencies(self):
         res = set()
@@ -128,15 +160,36 @@ class Calc(Stat):
         return res
     def __get__(self, obj, cls=None):
         if obj is None: return self
-        func = getval(self.func, obj, cls)
+        if self._compiled is None:
+            self._compiled = compile_calc(self)
+            _compiled_calcs[id(self)] = self
+        if obj._memoize and self._has_name:
+            memo = obj._memo
+            name = self._name
+            if name in memo: return memo[name]
+            res = memo[name] = self._compiled(obj, cls)
+            return res
+        return self._compiled(obj, cls)
+    def _interpret(self, obj, cls=None):
+        """木構造をそのまま辿って評価する"""
+        def ival(a):
+            if type(a) is Calc: return a._interpret(obj, cls)
+            return getval(a, obj, cls)
+        func = ival(self.func)
         if self.func in rjoins:
-            args = [getval(a, obj, cls) for a in self.args[::-1]][::-1]
+            args = [ival(a) for a in self.args[::-1]][::-1]
         else:
-            args = [getval(a, obj, cls) for a in self.args]
-        ka = {k:getval(v, obj, cls) for k, v in self.kwargs.items()}
+            args = [ival(a) for a in self.args]
+        ka = {k:ival(v) for k, v in self.kwargs.items()}
         return func(*args, **ka)
     def __repr__(self):
         if self._has_name: return self._name
         return f'{self.func.__name__}({", ".join(a for a in self.args)})'
 
+_compiled_calcs = weakref.WeakValueDictionary() # {id: コンパイル済みのCalc}
+def _reset_compiled():
+    """コンパイル済みの関数を捨て、次の読み出しでコンパイルし直させる"""
+    for c in list(_compiled_calcs.values()): c._compiled = None
+    _compiled_calcs.clear()
 
+from .compiler import compile_calc
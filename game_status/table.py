@@ -0,0 +1,273 @@
+# coding: utf-8
+'''
+# 列指向のステータス表
+- class StatTable
+  - 同じクラスの大量のオブジェクトをNumPyの列で保持する
+
+NumPyが必要です。
+```bash
+pip install numpy
+```
+'''
+import numpy as np
+
+from .bases import GameObject, StatBase, BuffList
+from .stats import StatEffect, Value, Point, Calc
+from . import effects
+from .compiler import _BINOPS, _UNOPS
+
+class _Rowwise(Exception):
+    """ベクトル化できないので行ごとに評価する"""
+
+# 列全体にそのまま適用できる関数
+_VECTORIZE = set(_BINOPS) | set(_UNOPS) | {id(abs)}
+
+def _dtype(value) -> np.dtype:
+    if isinstance(value, np.ndarray): return value.dtype
+    if isinstance(value, (bool, int, float, np.generic)):
+        return np.asarray(value).dtype
+    return np.dtype(object)
+
+def _scalar(col:np.ndarray, i):
+    v = col[i]
+    return v if col.dtype == object else v.item()
+
+class _Cell:
+    """行ビューの裏側の値(`_Cls__name_v`)を列に読み書きする"""
+    def __init__(self, name): self._name = name
+    def __get__(self, obj, cls=None):
+        if obj is None: return self
+        return _scalar(obj._table._cols[self._name], obj._row)
+    def __set__(self, obj, value):
+        obj._table._write(self._name, obj._row, value)
+
+class StatTable:
+    """# 列指向のステータス表
+    GameObjectのサブクラスのValueとPointを、行ごとではなく列ごとに保持します。
+    - `column(name)`でCalcを含むステータス値を列全体で計算
+    - `turn()`でturn効果を列全体に一度に適用(minim, maximはclipになります)
+    - `table[i]`で通常のGameObjectと同じように使える行ビューを取得
+    ```python
+    from game_status import *
+    from game_status.table import StatTable
+
+    class Monster(GameObject):
+        STR = Value(arg(1), minim(0))
+        HP_max = (STR + 1) * 10
+        HP = Point(arg(HP_max), turn(-1))
+
+    table = StatTable(Monster)
+    table.spawn(100000, STR=3)
+    table.turn()
+    assert (table.column("HP") == 39).all()
+
+    m = table[0] # 行ビュー
+    m.buffs.append(...) # バフなども普段通り
+    m.HP = 10
+    assert table.column("HP")[0] == 10
+    ```
+    ベクトル化できない計算式や効果(文字列の演算、buffed()のついた行など)は
+    行ビューを使って一行ずつ評価します。
+    """
+    def __init__(self, cls:type[GameObject], capacity:int=16):
+        self.cls = cls
+        self._columns = {} # {name: vname}
+        for name in cls._dependency_graph:
+            stat = getattr(cls, name, None)
+            if type(stat) in (Value, Point) and '_vname' in vars(stat):
+                self._columns[name] = stat._vname
+        self._cols = {} # {name: np.ndarray}
+        self._n = 0
+        self._cap = capacity
+        self._views = {} # {row: 行ビュー}
+        self._view = type(cls.__name__, (cls,), {
+            vname: _Cell(name) for name, vname in self._columns.items()},
+            memoize=False, track=False)
+
+    # 行
+    def __len__(self): return self._n
+    def __getitem__(self, i:int) -> GameObject:
+        """行ビュー"""
+        if not -self._n <= i < self._n: raise IndexError(i)
+        i %= self._n
+        view = self._views.get(i)
+        if view is None:
+            view = object.__new__(self._view)
+            view._table, view._row = self, i
+            view._buffs = BuffList(view)
+            self._views[i] = view
+        return view
+    def __iter__(self):
+        for i in range(self._n): yield self[i]
+    def append(self, obj:GameObject|None=None, /, **ka) -> int:
+        """オブジェクト(またはコンストラクタ引数)から一行追加する"""
+        if obj is None: obj = self.cls(**ka)
+        i = self._n
+        self._reserve(i + 1)
+        self._n += 1
+        for name, vname in self._columns.items():
+            self._write(name, i, getattr(obj, vname, None))
+        if obj.buffs: self[i].buffs.extend(obj.buffs)
+        return i
+    def spawn(self, n:int, /, **ka) -> range:
+        """同じ引数で初期化したn行を追加する"""
+        proto = self.cls(**ka)
+        start = self._n
+        self._reserve(start + n)
+        self._n += n
+        for name, vname in self._columns.items():
+            self._write(name, slice(start, start + n),
+                        getattr(proto, vname, None))
+        return range(start, start + n)
+    def keep(self, mask):
+        """maskが真の行だけを残す(消えた行のビューは使えなくなります)"""
+        mask = np.asarray(mask, dtype=bool)[:self._n]
+        idx = np.flatnonzero(mask)
+        for name, col in self._cols.items():
+            col[:len(idx)] = col[idx]
+        pos = np.cumsum(mask) - 1
+        views, self._views = self._views, {}
+        for i, view in views.items():
+            if mask[i]:
+                view._row = int(pos[i])
+                self._views[view._row] = view
+            else: view._table = None
+        self._n = len(idx)
+
+    # 列
+    def raw(self, name:str) -> np.ndarray:
+        """裏側の値の列(書き込み可能)"""
+        col = self._cols.get(name)
+        if col is None: # まだ一行も書き込まれていない
+            if name not in self._columns: raise KeyError(name)
+            return np.empty(0)
+        return col[:self._n]
+    def column(self, name:str) -> np.ndarray:
+        """ステータス値を全行について計算した列"""
+        res = self._eval(getattr(self.cls, name), {})
+        if not isinstance(res, np.ndarray):
+            res = np.full(self._n, res, dtype=_dtype(res))
+        return res
+
+    # ターン
+    def turn(self):
+        """全行のターン経過処理(GameObject.turnと同じ順序)"""
+        if not self._n: return # 空の列を作ると型が決まってしまう
+        cls = self.cls
+        if cls._pre_turn is not GameObject._pre_turn:
+            for row in self: row._pre_turn()
+        for name in cls._dependency_graph:
+            if name not in cls._turn_act.keys(): continue
+            eff = self._turn_effect(name)
+            try:
+                if eff is None: raise _Rowwise
+                memo = {}
+                new = (self._eval(getattr(cls, name), memo) +
+                       self._eval(eff._val, memo))
+                self._write(name, slice(0, self._n), new)
+            except _Rowwise:
+                act = cls._turn_act.bind(name)
+                for row in self: act(row)
+        for view in list(self._views.values()):
+            if view._buffs: view._turn_buffs()
+        if cls._post_turn is not GameObject._post_turn:
+            for row in self: row._post_turn()
+    def _turn_effect(self, name):
+        if name not in self._columns: return None
+        res = None
+        for o in getattr(self.cls, name)._ops:
+            if isinstance(o, effects.turn):
+                res = o if type(o) is effects.turn and o._every == 1 else None
+        return res
+
+    # 内部処理
+    def _reserve(self, n):
+        if n <= self._cap: return
+        self._cap = max(n, self._cap * 2)
+        for name, col in self._cols.items():
+            new = np.empty(self._cap, dtype=col.dtype)
+            if col.dtype == object: new.fill(None)
+            new[:self._n] = col[:self._n]
+            self._cols[name] = new
+    def _write(self, name, idx, value):
+        col = self._cols.get(name)
+        dt = _dtype(value)
+        if col is None:
+            col = self._cols[name] = np.empty(self._cap, dtype=dt)
+            if dt == object: col.fill(None)
+        elif np.promote_types(col.dtype, dt) != col.dtype:
+            col = self._cols[name] = col.astype(np.promote_types(col.dtype, dt))
+        col[idx] = value
+    def _rowwise(self, stat) -> np.ndarray:
+        values = [stat.__get__(row, self._view) for row in self]
+        dt = np.dtype(bool)
+        for v in values: dt = np.promote_types(dt, _dtype(v))
+        res = np.empty(self._n, dtype=dt)
+        if dt == object:
+            for i, v in enumerate(values): res[i] = v
+        else: res[:] = values
+        return res
+    def _eval(self, a, memo):
+        """aを全行について評価する(定数はそのまま返す)"""
+        if not isinstance(a, StatBase): return a
+        if id(a) in memo: return memo[id(a)]
+        try: res = self._vector(a, memo)
+        except _Rowwise: res = self._rowwise(a)
+        memo[id(a)] = res
+        return res
+    def _vector(self, a, memo):
+        if type(a) is Point and a._has_name and a._name in self._columns:
+            return self.raw(a._name).copy()
+        if type(a) is Value and a._has_name and a._name in self._columns:
+            res = self.raw(a._name).copy()
+            ops = iter(a._ops)
+            for o in ops:
+                if type(o) is effects.minim:
+                    nxt = next(ops, None)
+                    if type(nxt) is effects.maxim: # 上下限はclipにまとめる
+                        try: res = np.clip(res, self._eval(o._m, memo),
+                                           self._eval(nxt._m, memo))
+                        except TypeError: raise _Rowwise
+                        continue
+                    res = self._effect(o, res, memo)
+                    if nxt is None: break
+                    o = nxt
+                res = self._effect(o, res, memo)
+            return res
+        if type(a) is Calc:
+            if id(a.func) not in _VECTORIZE: raise _Rowwise
+            args = [self._eval(x, memo) for x in a.args]
+            kwargs = {k: self._eval(v, memo) for k, v in a.kwargs.items()}
+            try:
+                with np.errstate(all='raise'):
+                    res = a.func(*args, **kwargs)
+            except Exception: raise _Rowwise
+            if isinstance(res, np.ndarray) and res.shape == (self._n,):
+                return res
+            if not any(isinstance(x, np.ndarray)
+                       for x in args + list(kwargs.values())):
+                return res
+        raise _Rowwise
+    def _effect(self, o, col, memo):
+        """StatEffect.getを列全体に適用する"""
+        t = type(o)
+        if t.get is StatEffect.get: return col
+        try:
+            if t is effects.minim:
+                return np.maximum(col, self._eval(o._m, memo))
+            if t is effects.maxim:
+                return np.minimum(col, self._eval(o._m, memo))
+            if t is effects.bonus:
+                return col + self._eval(o._attr, memo)
+        except TypeError: raise _Rowwise
+        if t is effects.buffed:
+            rows = {i: v for i, v in self._views.items() if v._buffs}
+            if not rows: return col
+            values = {i: o.get(_scalar(col, i), v, self._view)
+                      for i, v in rows.items()}
+            dt = col.dtype
+            for v in values.values(): dt = np.promote_types(dt, _dtype(v))
+            col = col.astype(dt)
+            for i, v in values.items(): col[i] = v
+            return col
+        raise _Rowwise
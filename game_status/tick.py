@@ -0,0 +1,117 @@
+# coding: utf-8
+'''
+# asyncioでのティック
+- class TickDriver
+  - GameObjectの集まりのturn()を、時間の予算ごとにイベントループへ譲りながら進める
+
+ティックを予約すると、その時点のオブジェクトが順番待ちの列に並びます。
+列は一体ずつturn()され(バフのターンもそのオブジェクトのturn()の中で進みます)、
+一回のスライスで`budget`秒を使い切るとイベントループに制御を返します。
+終わらなかった分は次のスライスに持ち越されます。次のティックはその後ろに並ぶので、
+同じオブジェクトのターンの順序が入れ替わることはありません。
+'''
+import asyncio, collections, time
+
+from .bases import GameObject
+
+class _TickEnd:
+    """列の中のティックの区切り"""
+    __slots__ = ("tick", "start")
+    def __init__(self, tick, start): self.tick, self.start = tick, start
+
+class TickDriver:
+    """# ティックの駆動
+    ```python
+    from game_status.tick import TickDriver
+
+    driver = TickDriver(monsters, budget=0.002) # 2msごとにイベントループへ譲る
+    async def main():
+        asyncio.create_task(driver.run(interval=1/20)) # 20ティック/秒
+        ...
+        print(driver.metrics()) # ティックの所要時間や持ち越しの量
+    ```
+    `await driver.tick()`で1ティックだけ進めることもできます。
+    """
+    def __init__(self, objs=(), budget:float=0.005):
+        self.objects = {} # {id(obj): obj} 加えた順
+        self.budget = budget
+        self.ticks = 0 # 予約したティック数
+        self.done = 0 # 終わったティック数
+        self.slices = 0
+        self.tick_duration = 0. # 最後に終わったティックの、予約から終わるまでの秒数
+        self.max_tick_duration = 0.
+        self._queue = collections.deque() # [obj | _TickEnd, ...]
+        self._waiting = 0 # 列に並んでいるturn()の数
+        for o in objs: self.add(o)
+
+    def __len__(self): return len(self.objects)
+    def add(self, obj:GameObject):
+        """次に予約するティックから加える"""
+        self.objects[id(obj)] = obj
+    def remove(self, obj:GameObject):
+        """列に残っている分もturn()しない"""
+        del self.objects[id(obj)]
+
+    # 指標
+    @property
+    def backlog(self) -> int:
+        """持ち越されているturn()の数"""
+        return self._waiting
+    def metrics(self) -> dict:
+        return {"ticks": self.ticks, "done": self.done,
+                "pending_ticks": self.ticks - self.done,
+                "backlog": self._waiting, "slices": self.slices,
+                "tick_duration": self.tick_duration,
+                "max_tick_duration": self.max_tick_duration}
+
+    # 進行
+    def schedule(self):
+        """1ティック分のturn()を列に並べる"""
+        self.ticks += 1
+        self._queue.extend(self.objects.values())
+        self._queue.append(_TickEnd(self.ticks, time.perf_counter()))
+        self._waiting += len(self.objects)
+    def run_slice(self) -> bool:
+        """予算を使い切るか列が空になるまで進め、列が残っていればTrueを返す"""
+        queue, objs = self._queue, self.objects
+        clock = time.perf_counter
+        deadline = clock() + self.budget
+        while queue:
+            o = queue.popleft()
+            if type(o) is _TickEnd:
+                self._tick_done(o, clock())
+                continue
+            self._waiting -= 1
+            if id(o) in objs: o.turn()
+            if clock() >= deadline: break
+        self.slices += 1
+        return bool(queue)
+    def _tick_done(self, end:_TickEnd, now:float):
+        self.done = end.tick
+        self.tick_duration = d = now - end.start
+        if d > self.max_tick_duration: self.max_tick_duration = d
+
+    async def drain(self):
+        """列が空になるまで、スライスごとにイベントループへ譲りながら進める"""
+        while self.run_slice(): await asyncio.sleep(0)
+    async def tick(self):
+        """1ティック進める"""
+        self.schedule()
+        await self.drain()
+    async def run(self, interval:float, ticks:int|None=None):
+        """interval秒ごとにティックを予約して進める(ticksを指定すればその回数だけ)
+        遅れているときは、遅れたティックを一度にまとめて予約せず、列の後ろに一つずつ並べます。"""
+        loop = asyncio.get_running_loop()
+        next_at, n = loop.time(), 0
+        while ticks is None or n < ticks:
+            now = loop.time()
+            if now >= next_at:
+                self.schedule()
+                n += 1
+                next_at += interval
+                if next_at <= now: next_at = now + interval
+            if self._queue:
+                self.run_slice()
+                await asyncio.sleep(0)
+            else: await asyncio.sleep(next_at - loop.time())
+        await self.drain()
@@ -0,0 +1,216 @@
+# coding: utf-8
+'''
+# ワールド
+- class World
+  - 多数のGameObjectを所持し、turn()を複数のプロセスで並列に実行する
+
+オブジェクトは番号ごとに決まったワーカー(シャード)に常駐し、ターンごとに
+ワーカーからは変わった裏側の値と、バフの追加・削除・変わった値だけが送り返されます。
+バフはリストの中の位置で対応させ、このプロセスのバフリストをその場で書き換えるので、
+バフへの参照やバフの索引はそのまま保たれます。
+各オブジェクトのturn()がほかのオブジェクトに触れない限り、
+結果はワーカーの数によらず同じになります(差分は番号順に適用されます)。
+'''
+import multiprocessing as mp, os
+
+from .bases import GameObject
+from .snapshot import (
+    _MISSING, _attrs, _pack, _payload, _unpack, _encode,
+    SnapshotFile, dumps, loads)
+
+_attr_cache = {} # {type: 保存する属性名}
+def _attrs_of(obj):
+    cls = type(obj)
+    res = _attr_cache.get(cls)
+    if res is None: res = _attr_cache[cls] = _attrs(cls)
+    return res
+
+def _read(obj) -> list:
+    """属性の値(その場で書き換えられるリストなどは複製して比べる)"""
+    res = [getattr(obj, a, _MISSING) for a in _attrs_of(obj)]
+    for k, v in enumerate(res):
+        if type(v) in (list, dict, set): res[k] = type(v)(v)
+    return res
+def _diff(obj, before:list) -> tuple[tuple, bytes]:
+    """beforeから変わった属性の(番号, 詰めた値)"""
+    idx, values = [], []
+    for k, a in enumerate(_attrs_of(obj)):
+        v, old = getattr(obj, a, _MISSING), before[k]
+        if v is old or (type(v) is type(old) and v == old): continue
+        idx.append(k) ; values.append(v)
+    if not idx: return (), b""
+    tags, payload, extra = _pack(values)
+    return tuple(idx), b"".join((tags, _payload(tags).pack(*payload), *extra))
+def _write(obj, idx:tuple, data:bytes) -> dict:
+    """_diffした値を書き込み、書き換えたステータス名を返す"""
+    if not idx: return {}
+    attrs, layout = _attrs_of(obj), obj._layout
+    values, _ = _unpack(data, 0, len(idx))
+    names = {}
+    for k, v in zip(idx, values):
+        a = attrs[k]
+        if v is _MISSING:
+            try: delattr(obj, a)
+            except AttributeError: pass
+        else: setattr(obj, a, v)
+        if a in layout: names[layout[a]] = None
+    return names
+
+def _buff_diff(old:list, before:list, buffs) -> tuple|None:
+    """バフの差分 (並び, 更新, 追加したバフ) を返す(変わっていなければNone)
+    並びはターン後の各バフの、ターン前の位置(追加したものは-1)です。
+    更新は残ったバフの (ターン前の位置, 変わった属性の番号, 値) です。"""
+    pos = {id(b): k for k, b in enumerate(old)}
+    order = tuple(pos.get(id(b), -1) for b in buffs)
+    updates, added = [], []
+    for k, b in zip(order, buffs):
+        if k < 0: added.append(b) ; continue
+        idx, data = _diff(b, before[k])
+        if idx: updates.append((k, idx, data))
+    if order == tuple(range(len(old))):
+        if not updates: return None
+        order = None
+    return order, tuple(updates), b"".join(_encode(added)) if added else None
+
+def _turn_shard(objs:dict) -> list:
+    """シャードのターンを進め、[(番号, 変わった属性の番号, 値, バフの差分), ...]を返す"""
+    res = []
+    for i in sorted(objs):
+        obj = objs[i]
+        before = _read(obj)
+        old = list(obj._buffs)
+        old_values = [_read(b) for b in old]
+        obj.turn()
+        idx, data = _diff(obj, before)
+        buffs = None
+        if old or obj._buffs: buffs = _buff_diff(old, old_values, obj._buffs)
+        if idx or buffs is not None: res.append((i, idx, data, buffs))
+    return res
+
+def _work(conn, shard, classes):
+    """ワーカーの処理: 命令を受け取って常駐するオブジェクトを操作する"""
+    if isinstance(shard, tuple): # spawnのときはスナップショットで受け取る
+        ids, data = shard
+        shard = dict(zip(ids, SnapshotFile(data, classes)))
+    while True:
+        cmd, *a = conn.recv()
+        if cmd == "turn": conn.send(_turn_shard(shard))
+        elif cmd == "put": shard[a[0]] = loads(a[1], classes)
+        elif cmd == "remove": shard.pop(a[0], None)
+        elif cmd == "stop": break
+    conn.close()
+
+
+class World:
+    """# ワールド
+    ```python
+    from game_status.world import World
+    world = World(Monster() for _ in range(100000))
+    with world.start(workers=8): # ワーカーごとにオブジェクトを常駐させる
+        for _ in range(60): world.turn()
+        world[0].HP = 1
+        world.push(0) # 親プロセスで書き換えたものはpushで送る
+        world.turn()
+    ```
+    `start()`していなければ、turn()はこのプロセスで順番に実行します。
+    ワーカーはforkできる環境ではオブジェクトをそのまま引き継ぎ、
+    それ以外ではスナップショットで受け取ります
+    (そのときモジュールから読み込めないクラスは`classes`で渡してください)。
+    """
+    def __init__(self, objs=(), classes=()):
+        self.objects = {} # {番号: GameObject}
+        self._next = 0
+        self._classes = tuple(classes)
+        self._workers = [] # [(Process, Connection), ...]
+        for o in objs: self.add(o)
+
+    def __len__(self): return len(self.objects)
+    def __getitem__(self, i:int) -> GameObject: return self.objects[i]
+    def __iter__(self): return iter(self.objects.values())
+    def _shard(self, i:int) -> int: return i % len(self._workers)
+
+    def add(self, obj:GameObject) -> int:
+        """オブジェクトを加えて番号を返す"""
+        i = self._next
+        self._next += 1
+        self.objects[i] = obj
+        if self._workers: self._send(i, ("put", i, dumps(obj)))
+        return i
+    def remove(self, i:int) -> GameObject:
+        obj = self.objects.pop(i)
+        if self._workers: self._send(i, ("remove", i))
+        return obj
+    def push(self, *ids:int):
+        """このプロセスで書き換えたオブジェクトをワーカーに送る
+        起動していなければ何もしません(turnはこのプロセスのオブジェクトを使います)。"""
+        if not self._workers: return
+        for i in ids: self._send(i, ("put", i, dumps(self.objects[i])))
+    def _send(self, i, msg): self._workers[self._shard(i)][1].send(msg)
+
+    # ワーカー
+    def start(self, workers:int|None=None) -> 'World':
+        """ワーカーを起動し、オブジェクトを番号ごとに割り当てる"""
+        if self._workers: raise Exception("すでに起動しています。")
+        workers = workers or os.cpu_count() or 1
+        fork = "fork" in mp.get_all_start_methods()
+        ctx = mp.get_context("fork" if fork else "spawn")
+        shards = [{} for _ in range(workers)]
+        for i, obj in self.objects.items(): shards[i % workers][i] = obj
+        for shard in shards:
+            if not fork:
+                shard = (tuple(shard), b"".join(_encode(shard.values())))
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_work, args=(child, shard, self._classes),
+                            daemon=True)
+            p.start()
+            child.close()
+            self._workers.append((p, parent))
+        return self
+    def stop(self):
+        """ワーカーを終了する(オブジェクトはこのプロセスに残ります)"""
+        for p, conn in self._workers:
+            conn.send(("stop",))
+            conn.close()
+        for p, _ in self._workers: p.join()
+        self._workers = []
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.stop()
+
+    # ターン
+    def turn(self):
+        """すべてのオブジェクトのターンを進める"""
+        if not self._workers:
+            for i in sorted(self.objects): self.objects[i].turn()
+            return
+        for _, conn in self._workers: conn.send(("turn",))
+        deltas = []
+        for _, conn in self._workers: deltas += conn.recv()
+        deltas.sort(key=lambda d: d[0])
+        for d in deltas: self._apply(*d)
+    def _apply(self, i, idx, data, buffs):
+        """ワーカーから届いた差分をこのプロセスのオブジェクトに書き込む"""
+        obj = self.objects.get(i)
+        if obj is None: return
+        names = _write(obj, idx, data)
+        if buffs is not None: self._apply_buffs(obj, *buffs)
+        for n in names: obj._stat_changed(n)
+    def _apply_buffs(self, obj, order, updates, added):
+        """バフの差分をバフリストにその場で適用する"""
+        buffs = obj._buffs
+        old = list(buffs)
+        updated = []
+        for k, idx, data in updates:
+            b = old[k]
+            for n in _write(b, idx, data): b._stat_changed(n)
+            updated.append(b)
+        if order is None:
+            obj._buffs_changed(added=(), removed=(), updated=updated)
+            return
+        new = iter(SnapshotFile(added, self._classes) if added else ())
+        items = [old[k] if k >= 0 else next(new) for k in order]
+        kept = set(order)
+        list.__setitem__(buffs, slice(None), items) # 重ね直さずにそのまま並べる
+        obj._buffs_changed(
+            added=[b for k, b in zip(order, items) if k < 0],
+            removed=[b for k, b in enumerate(old) if k not in kept],
+            updated=updated)
@@ -8,6 +8,7 @@ setup(
     long_description=open('README.md', encoding="utf-8").read(),
     long_description_content_type='text/markdown',
     url='https://github.com/Shinngetsu/game_status.git',
-    packages=find_packages(),
+    packages=find_packages(exclude=("bench", "bench.*")),
+    extras_require={'table': ['numpy']},
     license='MIT',
 )
\ No newline at end of file
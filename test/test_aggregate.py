@@ -0,0 +1,52 @@
+import pytest
+from game_status import *
+from game_status.aggregate import Members, Sum, Count, Min, Max, Mean
+from game_status import snapshot
+
+class Hero(GameObject):
+    STR = Value(arg(1))
+    aura = (STR + 1) * 2
+    HP = Point(arg(10), turn(-1))
+
+class Party(GameObject, memoize=True):
+    members = Members()
+    total_STR = Sum("members", "STR")
+    alive = Count("members", "HP")
+    aura = Max("members", "aura", default=0)
+    weakest = Min("members", "STR")
+    mean_STR = Mean("members", "STR")
+    power = total_STR * 10 + aura
+    HP = Value(arg(1000), maxim(aura * 100))
+
+@pytest.mark.timeout(10)
+def test_Aggregate_UpdatesIncrementally():
+    a, b = Hero(STR=3), Hero(STR=5)
+    party = Party()
+    assert (party.total_STR, party.aura, party.weakest, party.mean_STR) == (0, 0, None, None)
+    party.members = [a, b]
+    assert (party.total_STR, party.aura, party.weakest, party.power) == (8, 12, 3, 92)
+    assert party.HP == 1000
+    b.STR = 1 # auraはSTRに依存する
+    assert (party.total_STR, party.aura, party.weakest, party.power) == (4, 8, 1, 48)
+    assert (party.mean_STR, party.HP) == (2, 800)
+    for _ in range(10): a.turn()
+    assert party.alive == 1
+    party.members.remove(b)
+    assert (party.total_STR, party.aura, party.alive) == (3, 8, 0)
+    with pytest.raises(Exception): party.members.append(a)
+
+@pytest.mark.timeout(10)
+def test_Aggregate_PickleRoundTrip():
+    import pickle
+    party = Party()
+    party.members = [Hero(STR=3), Hero(STR=5)]
+    assert party.power == 92
+    res = pickle.loads(pickle.dumps(party))
+    a, b = res.members
+    b.STR = 1 # 復元したメンバーの書き換えも届く(記憶したpowerも破棄される)
+    assert (res.total_STR, res.aura, res.power) == (4, 8, 48)
+    assert len(b._listeners) == 1
+    res.members.remove(a)
+    assert res.total_STR == 1
+    with pytest.raises(Exception): res.members.append(b)
+    with pytest.raises(TypeError): snapshot.dumps(party)
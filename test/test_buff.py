@@ -1,2 +1,102 @@
+import pytest
+from game_status import *
 
+@pytest.fixture
+def StrUp():
+    @StatAct.actfunc
+    def read_effect(b, obj, val): return val + 5
+    class StrUp(buff.Buff): pass
+    read_effect.register(StrUp, "STR")
+    return StrUp
 
+@pytest.mark.timeout(10)
+def test_BuffIndex_OnlyAffectedStats(StrUp):
+    class Status(GameObject):
+        STR = Value(arg(1), buffed())
+        DEX = Value(arg(1), buffed())
+    ins = Status()
+    b = StrUp()
+    ins.buffs.append(b)
+    assert (ins.STR, ins.DEX) == (6, 1)
+    assert ins._buffs_for("STR") == [b]
+    assert ins._buffs_for("DEX") == ()
+    ins.buffs.remove(b)
+    assert ins.STR == 1
+    assert ins._buffs_for("STR") == []
+
+@pytest.mark.timeout(10)
+def test_BuffIndex_StatNamedEffect():
+    class Status(GameObject):
+        STR = Value(arg(1), buffed())
+    class Weak(buff.Buff):
+        effect = Value(arg(default=2))
+        STR = buff.Add(-effect)
+    ins = Status()
+    ins.buffs.append(Weak())
+    assert ins.STR == 1
+    assert ins._buffs_for("STR") == ()
+
+@pytest.mark.timeout(10)
+def test_Stacking_AggregatesAndExpires():
+    class Status(GameObject):
+        HP = Point(arg(1000))
+    class Poison(buff.Buff, stacking=True):
+        effect = Value(arg(default=1))
+        duration = Point(arg(default=2))
+        HP = buff.Add(-effect)
+
+    ins = Status()
+    for _ in range(40): ins.buffs.append(Poison())
+    for _ in range(10): ins.buffs.append(Poison(duration=3))
+    ins.buffs.append(Poison(effect=5))
+    assert len(ins.buffs) == 2
+    assert ins.buffs[0].stacks == 50
+    ins.turn()
+    assert ins.HP == 1000 - 50 - 5
+    ins.turn()
+    assert ins.HP == 1000 - 100 - 10
+    assert [b.stacks for b in ins.buffs] == [10]
+    ins.turn()
+    assert ins.HP == 1000 - 110 - 10
+    assert ins.buffs == []
+
+@pytest.mark.timeout(10)
+def test_Stacking_RequiresDuration():
+    with pytest.raises(Exception):
+        class Burn(buff.Buff, stacking=True): # durationがない
+            HP = buff.Add(-1)
+
+@pytest.mark.timeout(10)
+def test_Buff_ExpiredRemovedInBatch():
+    class Status(GameObject):
+        HP = Point(arg(0))
+    class Regen(buff.Buff):
+        duration = Point(arg(default=2), turn(-1))
+        HP = buff.Add(1)
+        @property
+        def is_disabled(self): return self.duration <= 0
+    class Proc(buff.Buff):
+        HP = buff.Add(10)
+
+    ins = Status([Regen(), Proc(), Regen(duration=1)])
+    ins.turn()
+    assert ins.HP == 12
+    assert [type(b) for b in ins.buffs] == [Regen]
+    ins.turn()
+    assert ins.HP == 13
+    assert ins.buffs == []
+
+@pytest.mark.timeout(10)
+def test_Disable_StopsReadEffectAtOnce(StrUp):
+    class Status(GameObject, memoize=True):
+        STR = Value(arg(1), buffed())
+    class Charm(StrUp):
+        off = buff.Disable(1)
+    ins = Status()
+    b = Charm()
+    ins.buffs.append(b)
+    assert ins.STR == 6
+    b.turn(ins) # 対象のturnの途中
+    assert ins.buffs == [b] and ins.STR == 1
+    ins.turn()
+    assert ins.buffs == []
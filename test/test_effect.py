@@ -26,4 +26,12 @@ def test_maxim(Status):
     assert eff.get(50, ins, Status) == 50
     assert eff.get(110, ins, Status) == 100
 
-
+@pytest.mark.timeout(10)
+def test_grow():
+    class Status(GameObject):
+        STR = Value(arg(0), grow(2.))
+    ins = Status()
+    ins.gainexp("STR", 3) # 潜在値が未設定でも0から減らす
+    assert ins.STR == 6
+    ins.gainpot("STR", 5)
+    assert ins._Status__STR_p == 2
@@ -0,0 +1,39 @@
+import pytest
+from game_status import *
+
+class Regen(buff.Buff):
+    effect = Value(arg(3))
+    duration = Point(arg(5), turn(-1))
+    HP = buff.Add(effect)
+    @property
+    def is_disabled(self): return self.duration <= 0
+
+class Player(GameObject):
+    HP_max = Value(arg(100))
+    HP = Value(arg(10), minim(0), maxim(HP_max), turn(-2))
+    MP = Point(arg(0), turn(1, every=3))
+    EXP = Point(arg(0), turn(5))
+
+def _state(p):
+    return (p.HP, p.MP, p.EXP, p._Player__MP_t, [b.duration for b in p.buffs])
+
+@pytest.mark.timeout(10)
+@pytest.mark.parametrize("n", [1, 4, 5, 6, 40, 1000])
+def test_Advance_SameAsTurns(n):
+    stepped, advanced = Player(), Player()
+    for p in (stepped, advanced):
+        p.turn() # MPのカウンタを途中から始める
+        p.buffs.append(Regen(duration=7))
+        p.buffs.append(Regen(effect=20, duration=2))
+    for _ in range(n): stepped.turn()
+    advanced.advance(n)
+    assert _state(advanced) == _state(stepped)
+
+@pytest.mark.timeout(10)
+def test_Advance_Large():
+    p = Player(HP=50)
+    p.advance(10**9)
+    assert (p.HP, p.MP, p.EXP) == (0, 333333333, 5 * 10**9)
+    b = Regen(duration=10**6)
+    b.advance(p, 10)
+    assert (p.HP, b.duration) == (30, 10**6 - 10)
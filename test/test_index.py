@@ -0,0 +1,31 @@
+import pytest
+from game_status import *
+from game_status.index import StatIndex
+
+class Monster(GameObject):
+    STR = Value(arg(1))
+    HP_max = (STR + 1) * 10
+    HP = Point(arg(HP_max), turn(-3))
+
+@pytest.mark.timeout(10)
+def test_StatIndex_Queries():
+    ms = [Monster(STR=s) for s in (5, 1, 9, 3, 7)]
+    by_str = StatIndex("STR", ms)
+    assert [m.STR for m in by_str.top(2)] == [9, 7]
+    assert [m.STR for m in by_str.between(3, 7)] == [3, 5]
+    assert [m.STR for m in by_str.above(5, inclusive=True)] == [9, 7, 5]
+    ms[2].STR = 0
+    assert [m.STR for m in by_str.bottom(2)] == [0, 1]
+    by_str.remove(ms[0])
+    assert [m.STR for m in by_str] == [0, 1, 3, 7]
+
+@pytest.mark.timeout(10)
+def test_StatIndex_FollowsDependencies():
+    ms = [Monster(STR=s) for s in (1, 2)]
+    ratio = StatIndex(Monster.HP / Monster.HP_max, ms)
+    by_max = StatIndex("HP_max", ms)
+    for _ in range(5): ms[0].turn()
+    assert ratio.below(0.5) == [ms[0]]
+    ms[1].STR = 10 # HP_maxが変わる
+    assert by_max.top(1) == [ms[1]]
+    assert ratio.below(0.5) == [ms[0], ms[1]] # HP / HP_maxも変わる
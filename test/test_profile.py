@@ -0,0 +1,26 @@
+
+import pytest
+from game_status import *
+from game_status import profile
+from game_status.bases import StatAct
+
+
+@pytest.mark.timeout(10)
+def test_Profile_CountsAndRestores():
+    class Status(GameObject):
+        STR = Value(arg(1), minim(0))
+        HP_max = (STR + 1) * 10
+        HP = Point(arg(HP_max), turn(-1))
+    get, bind = Value.__get__, StatAct.bind
+    ins = Status()
+    with profile.profiling(Status) as prof:
+        for _ in range(3): ins.HP_max
+        ins.turn()
+    assert Value.__get__ is get and StatAct.bind is bind
+    name = Status.__qualname__
+    assert prof.records[("stat", f"{name}.HP_max")][0] == 3
+    assert prof.records[("stat", f"{name}.STR")][0] == 3
+    assert prof.records[("effect", "minim")][0] == 3
+    assert prof.records[("act", "_turn_act:HP")][0] == 1
+    assert prof.hot_chains(Status, 1)[0][1][-2:] == ["HP_max", "STR"]
+    assert ins.HP_max == 20
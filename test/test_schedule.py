@@ -0,0 +1,47 @@
+
+import pytest
+from game_status import *
+from game_status.schedule import Scheduler
+
+class Apple(GameObject):
+    turn_period = 60
+    freshness = Value(arg(100), turn(-1))
+
+class Player(GameObject):
+    HP = Point(arg(50), turn(1))
+    MP = Point(arg(0), turn(1, every=3))
+
+class NPC(GameObject):
+    turn_period = None
+    HP = Point(arg(100), turn(1))
+
+
+@pytest.mark.timeout(10)
+def test_Scheduler_WakesOnlyDueObjects():
+    sched = Scheduler()
+    apple, player, npc = Apple(), Player(), NPC()
+    sched.add(apple) ; sched.add(player) ; sched.add(npc, wake_on=("HP",))
+    assert sched.run(120) == 122
+    assert (apple.freshness, player.HP, player.MP, npc.HP) == (98, 170, 40, 100)
+    npc.HP -= 10
+    assert sched.step() == 2
+    assert sched.step() == 1
+    assert npc.HP == 91
+    sched.sleep(player)
+    assert sched.run(10) == 0
+
+class Guard(GameObject):
+    turn_period = None
+    STR = Value(arg(1))
+    alert = STR * 2
+
+@pytest.mark.timeout(10)
+def test_Scheduler_WakesOnDependencies():
+    sched = Scheduler()
+    guard = Guard()
+    sched.add(guard, wake_on=("alert",))
+    assert sched.run(5) == 0
+    guard.STR = 2 # alertが連動して変わる
+    assert sched.step() == 1
+    with pytest.raises(Exception): sched.add(other := Guard(), wake_on=("HP",))
+    assert other not in sched
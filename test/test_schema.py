@@ -0,0 +1,56 @@
+
+import pytest
+from game_status import *
+from game_status import schema
+import game_status.bases as bases
+
+SCHEMA = {"classes": {
+    "Monster": {
+        "memoize": True,
+        "stats": {
+            "HP": {"Point": [["arg", "HP_max"], ["minim", 0], ["maxim", "HP_max"]]},
+            "HP_max": "(STR + 1) * 10",
+            "STR": {"Value": [["arg", 1], ["minim", 0], "buffed"]},
+            "name": "'スライム' + '（瀕死）' * (HP < HP_max / 10)"}},
+    "Boss": {"base": "Monster", "stats": {"ATK": "max(STR * 2, 5)"}},
+    "Poison": {"base": "Buff", "stats": {
+        "effect": {"Value": [["arg", 1]]},
+        "HP": {"Add": "-effect"}}}}}
+
+
+@pytest.mark.timeout(10)
+def test_Schema_BuildsClasses():
+    c = schema.load_schema(SCHEMA)
+    m = c["Boss"](STR=2)
+    assert (m.HP_max, m.HP, m.ATK, m.name) == (30, 30, 5, "スライム")
+    m.buffs.append(c["Poison"](effect=28))
+    m.turn()
+    assert (m.HP, m.name) == (2, "スライム（瀕死）")
+
+
+@pytest.mark.timeout(10)
+def test_Schema_Errors():
+    with pytest.raises(schema.SchemaError):
+        schema.load_schema({"A": {"stats": {"X": "Y + 1", "Y": "X + 1"}}})
+    with pytest.raises(schema.SchemaError):
+        schema.load_schema({"A": {"stats": {"X": "__import__('os')"}}})
+
+
+@pytest.mark.timeout(10)
+def test_Schema_WarmCacheSkipsParsing(tmp_path, monkeypatch):
+    cold = schema.load_schema(SCHEMA, cache_dir=tmp_path)
+    def fail(*a): raise AssertionError("parsed")
+    monkeypatch.setattr(schema, "_parse", fail)
+    monkeypatch.setattr(bases, "_toposort", fail)
+    warm = schema.load_schema(SCHEMA, cache_dir=tmp_path)
+    assert warm["Boss"]._init_order == cold["Boss"]._init_order
+    assert warm["Boss"](STR=3).ATK == 6
+    path, = tmp_path.iterdir()
+    assert path.name.endswith(".schema.json") # pickleではないので読み込んでもコードは実行されない
+
+
+@pytest.mark.timeout(10)
+def test_Schema_UncacheableConstant(tmp_path):
+    c = schema.load_schema({"A": {"stats": {"X": "abs(3j + 4)"}}}, cache_dir=tmp_path)
+    assert c["A"]().X == 5
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,56 @@
+
+import pytest
+from game_status import *
+from game_status import snapshot
+
+class Poison(buff.Buff):
+    effect = Value(arg(1))
+    duration = Point(arg(10), turn(-1))
+    HP = buff.Add(-effect)
+
+class Monster(GameObject):
+    STR = Value(arg(2), minim(0), grow(), buffed())
+    name = Value(arg("slime"))
+    HP_max = (STR + 1) * 10
+    HP = Point(arg(HP_max), minim(0), maxim(HP_max))
+
+
+@pytest.mark.timeout(10)
+def test_Snapshot_RoundTrip():
+    m = Monster(name="スライム")
+    m.gainpot("STR", 5)
+    m.gainexp("STR", 2)
+    m.HP = 7
+    m.buffs.append(Poison(effect=3))
+    res = snapshot.loads(snapshot.dumps(m))
+    assert type(res) is Monster
+    assert (res.STR, res.name, res.HP_max, res.HP) == (4, "スライム", 50, 7)
+    assert [(type(b), b.effect, b.duration) for b in res.buffs] == [(Poison, 3, 10)]
+    res.turn()
+    assert res.HP == 4
+
+
+@pytest.mark.timeout(10)
+def test_Snapshot_FileSkipsInit(tmp_path, monkeypatch):
+    path = tmp_path / "world.snap"
+    snapshot.save(path, [Monster(STR=i) for i in range(100)])
+    monkeypatch.setattr(Monster, "__init__", None)
+    with snapshot.load(path) as snap:
+        assert len(snap) == 100
+        assert snap[42].STR == 42
+        assert [m.HP for m in snap][-1] == 1000
+
+
+@pytest.mark.timeout(10)
+def test_Snapshot_EncodeChanges():
+    class Player(GameObject, track=("STR", "HP_max", "name")):
+        STR = Value(arg(1))
+        name = Value(arg("勇者"))
+        HP_max = (STR + 1) * 10
+    p = Player()
+    p.changes()
+    p.STR = 2
+    p.name = "まおう"
+    data = snapshot.encode_changes(Player, p.changes())
+    assert snapshot.decode_changes(Player, data) == {
+        "STR": 2, "name": "まおう", "HP_max": 30}
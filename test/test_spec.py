@@ -31,7 +31,7 @@ def test_Buff_WorkInStatus():
 
         @property
         def is_disabled(self):
-            return self.duration < 0
+            return self.duration <= 0
     
     buff_tgt = Status(HP = 50, MP = 100)
     buff_tgt.buffs.append(MyBuff(duration = 10))
@@ -73,3 +73,183 @@ def test_defin_Apple():
     assert ins.is_rotten == False
     assert ins.name == "りんご"
     assert ins.description
+
+
+@pytest.mark.timeout(10)
+def test_Memoize_InvalidatedByWrites():
+    class Status(GameObject, memoize=True):
+        STR = Value(arg(0), grow(1.))
+        maxHP = (STR + 1) * 10
+        HP = Point(arg(maxHP), maxim(maxHP))
+        MP = Value(arg(5))
+
+    ins = Status(STR = 1)
+    assert ins.maxHP == 20
+    assert 'maxHP' in ins._memo
+    ins.MP = 3
+    assert 'maxHP' in ins._memo
+    ins.gainexp("STR", 1)
+    assert 'maxHP' not in ins._memo
+    assert ins.maxHP == 30
+    ins.STR = 0
+    assert ins.maxHP == 10
+
+
+@pytest.mark.timeout(10)
+def test_Memoize_InvalidatedByBuffStats():
+    @StatAct.actfunc
+    def read_effect(b, obj, val): return val * b.rate
+    class Rage(buff.Buff):
+        rate = Value(arg(2))
+    read_effect.register(Rage, "STR")
+    class Status(GameObject, memoize=True):
+        STR = Value(arg(10), buffed())
+        power = STR + 1
+    ins = Status()
+    b = Rage()
+    ins.buffs.append(b)
+    assert ins.power == 21
+    b.rate = 3
+    assert ins.power == 31
+    ins.buffs.remove(b)
+    assert ins.power == 11 and not b._listeners
+
+
+@pytest.mark.timeout(10)
+def test_InitPlan_PerClass():
+    class A(GameObject):
+        HP = Point(arg(10))
+    class B(GameObject):
+        HP = Point(arg(20))
+        MP = Point(arg(default=HP))
+    assert A().HP == 10
+    assert B().HP == 20
+    assert B(HP = 5).MP == 5
+    assert [n for n, *_ in B._init_plan] == ['HP', 'MP']
+
+
+@pytest.mark.timeout(10)
+def test_Turn_IncludesInheritedStats():
+    class Base(GameObject):
+        HP = Point(arg(10), turn(-1))
+    class Derived(Base):
+        MP = Point(arg(10), turn(-2))
+        STR = Value(arg(1))
+    ins = Derived()
+    ins.turn()
+    assert (ins.HP, ins.MP, ins.STR) == (9, 8, 1)
+    assert len(Derived._turn_plan) == 2
+
+
+@pytest.mark.timeout(10)
+def test_Plans_FollowLateRegistration():
+    class Base(GameObject):
+        HP = Point(arg(10))
+    class Derived(Base): pass
+    @StatAct.actfunc
+    def _turn_act(obj): obj.HP -= 1
+    _turn_act.register(Base, "HP") # クラス定義の後
+    @StatAct.actfunc
+    def act(b, stat): stat.HP += 5
+    class Heal(buff.Buff): pass
+    act.register(Heal, "HP")
+    ins = Derived()
+    ins.turn()
+    assert ins.HP == 9
+    ins.buffs.append(Heal())
+    ins.turn()
+    assert ins.HP == 13
+
+
+@pytest.mark.timeout(10)
+def test_Compact_SlotsAndPickle():
+    import gc, pickle
+    global CompactStatus
+    class CompactStatus(GameObject, compact=True):
+        STR = Value(arg(1), grow(1.))
+        maxHP = (STR + 1) * 10
+        HP = Point(arg(maxHP))
+    ins = CompactStatus(STR = 2)
+    assert type(ins) is CompactStatus
+    assert "_CompactStatus__STR_v" in CompactStatus.__slots__
+    assert not any(type(r) is dict for r in gc.get_referents(ins)) # __dict__はまだない
+    ins.gainexp("STR", 1)
+    assert vars(ins) == {"_CompactStatus__STR_p": -1} # 潜在値は__dict__へ
+    assert (ins.STR, ins.maxHP, ins.HP) == (3, 40, 30)
+    res = pickle.loads(pickle.dumps(ins))
+    assert type(res) is type(ins)
+    assert (res.STR, res.HP) == (3, 30)
+
+
+@pytest.mark.timeout(10)
+def test_Track_ChangesOnlyDependents():
+    class Status(GameObject, track=True):
+        STR = Value(arg(1), grow(1.))
+        DEX = Value(arg(1))
+        maxHP = (STR + 1) * 10
+        HP = Point(arg(maxHP), turn(-1))
+    ins = Status()
+    assert ins.changes() == {"STR": 1, "DEX": 1, "maxHP": 20, "HP": 20}
+    assert ins.changes() == {}
+    ins.gainexp("STR", 1)
+    assert ins.changes() == {"STR": 2, "maxHP": 30}
+    ins.DEX = 1 # 同じ値
+    ins.turn()
+    assert ins.changes() == {"HP": 19}
+
+@pytest.mark.timeout(10)
+def test_Watch_CoalescedPerTurn():
+    class Status(GameObject):
+        STR = Value(arg(1))
+        DEX = Value(arg(1))
+        HP_max = (STR + 1) * 10
+        HP = Point(arg(HP_max), maxim(HP_max), turn(-1))
+        MP = Point(arg(10), turn(1))
+    ins = Status()
+    seen = []
+    for n in ("HP_max", "HP", "DEX", "MP"):
+        ins.watch(n, lambda obj, name, v: seen.append((name, v)))
+    ins.STR = 2
+    assert seen == [("HP_max", 30)] # HPは上限が変わっただけで値は同じ
+    seen.clear()
+    ins.turn() # HPとMPはターンに一度だけ
+    assert seen == [("HP", 19), ("MP", 11)]
+    seen.clear()
+    with ins.batch():
+        ins.HP -= 1 ; ins.HP -= 1
+    assert seen == [("HP", 17)]
+    seen.clear()
+    with ins.batch():
+        ins.DEX = 5 ; ins.DEX = 1 # 元に戻した
+    ins.STR = 2 # 同じ値
+    assert seen == []
+
+@pytest.mark.timeout(10)
+def test_Template_SharesDefaults():
+    class Monster(GameObject, compact=True):
+        STR = Value(arg(1))
+        DEX = Value(arg(1))
+        HP_max = (STR + 1) * 10
+        HP = Point(arg(HP_max), turn(-1))
+    Slime = Monster.template("Slime", STR=3)
+    a, b = Slime(), Slime()
+    assert (a.STR, a.HP) == (3, 40)
+    assert vars(a) == {} and a.buffs == [] # バフのリストはMonsterのスロット
+    a.turn()
+    assert (a.HP, b.HP) == (39, 40)
+    assert "_Monster__HP_v" not in vars(b)
+    c = Slime(STR=5) # 依存するHPも初期化し直す
+    assert (c.STR, c.DEX, c.HP) == (5, 1, 60)
+    assert "_Monster__DEX_v" not in vars(c)
+
+@pytest.mark.timeout(10)
+def test_StatAct_ApplyMany():
+    class Status(GameObject):
+        STR = Value(arg(1), grow(1.))
+        DEX = Value(arg(1), grow(1.))
+        HP = Point(arg(10))
+    a, b = Status(), Status()
+    assert StatAct.apply_many("gainexp", [(a, "STR", 2), (b, "HP", 5), (b, "DEX", 1)]) == 2
+    assert (a.STR, b.DEX, b.HP) == (3, 2, 10)
+    assert StatAct.apply_all("gainexp", [a, b], ("STR", "DEX", "HP"), 1) == 4
+    assert (a.STR, a.DEX, b.STR, b.DEX) == (4, 2, 2, 3)
@@ -14,3 +14,42 @@ def test_defin_GameObjWithPoint_NoErr():
         HP = Point(arg(100))
     ins = Status()
 
+
+@pytest.mark.timeout(10)
+def test_Calc_CompiledEqualsInterpreted():
+    class Status(GameObject):
+        STR = Value(arg(0), minim(0))
+        HP_max = (STR + 1) * 10
+        label = "HP:" + Calc(str, HP_max) + "/" + Calc(str, HP_max)
+    for s in (-3, 0, 5):
+        ins = Status(STR = s)
+        for n in ('HP_max', 'label'):
+            calc = vars(Status)[n]
+            assert getattr(ins, n) == calc._interpret(ins, Status)
+
+@pytest.mark.timeout(10)
+def test_Calc_ConstantFolding():
+    class Status(GameObject):
+        STR = Value(arg(1))
+        A = STR * Calc(abs, -5)
+    ins = Status()
+    assert ins.A == 5
+    assert 'abs' not in vars(Status)['A']._compiled.__source__
+
+@pytest.mark.timeout(10)
+def test_Calc_SignedZeroNotShared():
+    import math
+    class Status(GameObject):
+        X = Value(arg(-1.))
+        Z = X * 0.0 + X * -0.0
+    assert math.copysign(1, Status().Z) == 1
+
+@pytest.mark.timeout(10)
+def test_Calc_CallNotFolded():
+    import operator
+    calls = []
+    def roll(): calls.append(1) ; return len(calls)
+    class Status(GameObject):
+        A = Calc(operator.call, roll)
+    ins = Status()
+    assert (ins.A, ins.A) == (1, 2)
@@ -0,0 +1,45 @@
+import pytest
+np = pytest.importorskip("numpy")
+from game_status import *
+from game_status.table import StatTable
+
+@pytest.fixture
+def Monster():
+    class Monster(GameObject):
+        STR = Value(arg(1), minim(0), maxim(10))
+        HP_max = (STR + 1) * 10
+        HP = Point(arg(HP_max), turn(-1))
+        name = "monster" + "!" * (STR > 5)
+    return Monster
+
+@pytest.mark.timeout(10)
+def test_StatTable_MatchesObjects(Monster):
+    table = StatTable(Monster)
+    table.spawn(3, STR=3)
+    table.append(STR=20)
+    objs = [Monster(STR=3)] * 3 + [Monster(STR=20)]
+    for n in ("STR", "HP_max", "HP", "name"):
+        assert list(table.column(n)) == [getattr(o, n) for o in objs]
+
+@pytest.mark.timeout(10)
+def test_StatTable_TurnAndRowView(Monster):
+    table = StatTable(Monster)
+    table.spawn(4, STR=3)
+    table.turn()
+    assert (table.column("HP") == 39).all()
+    row = table[1]
+    row.HP = 5
+    assert row.HP == 5
+    assert table.column("HP")[1] == 5
+    table.turn()
+    assert list(table.column("HP")) == [38, 4, 38, 38]
+
+@pytest.mark.timeout(10)
+def test_StatTable_Empty(Monster):
+    table = StatTable(Monster)
+    assert len(table.raw("STR")) == 0
+    for n in ("STR", "HP_max", "HP", "name"):
+        assert len(table.column(n)) == 0
+    table.turn()
+    table.spawn(2, STR=3)
+    assert list(table.column("HP")) == [40, 40]
@@ -0,0 +1,33 @@
+import asyncio
+import pytest
+from game_status import *
+from game_status.tick import TickDriver
+
+class Slime(GameObject):
+    HP = Point(arg(10), turn(-1))
+
+@pytest.mark.timeout(10)
+def test_TickDriver_YieldsBetweenSlices():
+    slimes = [Slime() for _ in range(5)]
+    driver = TickDriver(slimes, budget=0) # 一体ごとに譲る
+    seen = []
+    async def other():
+        for _ in range(3):
+            seen.append(driver.backlog)
+            await asyncio.sleep(0)
+    async def main(): await asyncio.gather(driver.tick(), other())
+    asyncio.run(main())
+    assert seen == [4, 3, 2]
+    assert [s.HP for s in slimes] == [9] * 5
+    assert (driver.done, driver.backlog, driver.slices) == (1, 0, 6)
+
+@pytest.mark.timeout(10)
+def test_TickDriver_CarriesBacklog():
+    slimes = [Slime() for _ in range(3)]
+    driver = TickDriver(slimes, budget=0)
+    driver.schedule() ; driver.run_slice()
+    driver.schedule() # 前のティックの残りの後ろに並ぶ
+    assert driver.metrics()["pending_ticks"] == 2 and driver.backlog == 5
+    asyncio.run(driver.run(interval=0, ticks=2))
+    assert [s.HP for s in slimes] == [6] * 3
+    assert (driver.done, driver.backlog) == (4, 0)
@@ -0,0 +1,48 @@
+
+import pytest
+from game_status import *
+from game_status.world import World
+
+class Walker(GameObject):
+    STR = Value(arg(1))
+    HP_max = (STR + 1) * 10
+    HP = Point(arg(HP_max), minim(0), turn(-1))
+
+class Regen(buff.Buff):
+    duration = Point(arg(3), turn(-1))
+    HP = buff.Add(2)
+    @property
+    def is_disabled(self): return self.duration <= 0
+
+
+@pytest.mark.timeout(10)
+def test_World_SameResultForAnyWorkerCount():
+    def run(workers):
+        world = World((Walker(STR=i) for i in range(10)), classes=(Regen,))
+        world[3].buffs.append(Regen())
+        if workers: world.start(workers)
+        with world:
+            for _ in range(5): world.turn()
+            world[5].HP = 100
+            world.push(5) # 起動していなければ何もしない
+            world.turn()
+        return [(o.HP, len(o.buffs)) for o in world]
+    serial = run(0)
+    assert serial[3] == (40 - 6 + 6, 0)
+    assert serial[5] == (99, 0)
+    assert run(1) == serial == run(3)
+
+@pytest.mark.timeout(10)
+def test_World_BuffDeltasKeepReferences():
+    world = World((Walker() for _ in range(2)), classes=(Regen,))
+    b = Regen()
+    world[1].buffs.append(b)
+    with world.start(2):
+        world.turn()
+        assert world[1].buffs == [b] and b.duration == 2
+        world[1].buffs.append(Regen(duration=1))
+        world.push(1)
+        world.turn()
+        assert world[1].buffs == [b] and b.duration == 1
+        world.turn()
+    assert world[1].buffs == [] and world[1].HP == 20 - 3 + 2 * 4